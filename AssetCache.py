@@ -0,0 +1,109 @@
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QRunnable, QThreadPool
+from PyQt6.QtGui import QPixmap
+
+from AssetPack import load_image, load_scaled_image
+from Tracing import tracer
+
+
+class WarmUpJob(QRunnable):
+    """Фоновое декодирование и масштабирование картинок (QImage можно вне GUI-потока)"""
+
+    def __init__(self, cache, pixel_sizes):
+        super().__init__()
+        self.cache = cache
+        self.pixel_sizes = pixel_sizes
+
+    def run(self):
+        for number in range(1, self.cache.count + 1):
+            for pixels in self.pixel_sizes:
+                self.cache.scaled_image(number, pixels)
+
+
+class TileImageCache:
+    """Общий на процесс кэш картинок фишек
+
+    Каждый PNG декодируется один раз за время работы программы. Готовые
+    QPixmap хранятся под ключом (фишка, размер клетки, devicePixelRatio)
+    и вытесняются по LRU, как и отмасштабированные QImage: размер клетки
+    зависит от размера окна, и каждый новый размер дает новые картинки.
+    QImage можно готовить в фоновом потоке, QPixmap создается только в
+    GUI-потоке при первом запросе.
+    """
+
+    MAX_PIXMAPS = 256
+    MAX_SCALED_IMAGES = 256
+
+    def __init__(self, directory="images", count=24):
+        self.directory = directory
+        self.count = count
+        self.lock = threading.Lock()
+        self.images = {}            # номер -> QImage или None, если файла нет
+        self.scaled_images = OrderedDict()  # (номер, пиксели) -> QImage
+        self.pixmaps = OrderedDict()
+
+    def image(self, number):
+        """Исходная картинка фишки (декодируется один раз)"""
+        if not 1 <= number <= self.count:
+            return None
+        with self.lock:
+            if number in self.images:
+                return self.images[number]
+        path = os.path.join(self.directory, f"{number}.png")
+        with tracer.span("decode tile image", number=number):
+            image = load_image(path)
+        if image is None:
+            print(f"Изображение не найдено: {path}")
+        with self.lock:
+            self.images[number] = image
+        return image
+
+    def scaled_image(self, number, pixels):
+        key = (number, pixels)
+        with self.lock:
+            if key in self.scaled_images:
+                self.scaled_images.move_to_end(key)
+                return self.scaled_images[key]
+        # Пакет ресурсов может содержать фишку уже нужного размера
+        image = load_scaled_image(os.path.join(self.directory, f"{number}.png"), pixels)
+        if image is None:
+            image = self.image(number)
+        if image is not None and max(image.width(), image.height()) != pixels:
+            with tracer.span("scale tile image", number=number, pixels=pixels):
+                image = image.scaled(pixels, pixels, Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.SmoothTransformation)
+        with self.lock:
+            self.scaled_images[key] = image
+            while len(self.scaled_images) > self.MAX_SCALED_IMAGES:
+                self.scaled_images.popitem(last=False)
+        return image
+
+    def pixmap(self, number, tile_size, dpr=1.0):
+        """Готовый к отрисовке QPixmap для клетки tile_size логических пикселей"""
+        key = (number, tile_size, dpr)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            return pixmap
+
+        image = self.scaled_image(number, round(tile_size * dpr))
+        if image is None:
+            return None
+        with tracer.span("upload tile pixmap", number=number):
+            pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        self.pixmaps[key] = pixmap
+        while len(self.pixmaps) > self.MAX_PIXMAPS:
+            self.pixmaps.popitem(last=False)
+        return pixmap
+
+    def warm_up(self, tile_sizes, dpr=1.0):
+        """Запускает фоновую подготовку картинок для заданных размеров клеток"""
+        pixel_sizes = sorted({round(size * dpr) for size in tile_sizes})
+        QThreadPool.globalInstance().start(WarmUpJob(self, pixel_sizes))
+
+
+tile_cache = TileImageCache()
@@ -0,0 +1,239 @@
+"""Пакет ресурсов с заранее декодированными картинками
+
+Сборка (после изменения картинок или шрифта):
+    python AssetPack.py
+    python AssetPack.py --tile-sizes 90 120 150 --dpr 1 2
+
+Картинки хранятся уже декодированными (ARGB32 premultiplied), фишки -
+уменьшенными до TILE_MAX_PIXELS и дополнительно готовыми под размеры
+клеток уровней, шрифт - как есть. Формат (little-endian):
+    заголовок "<4sHI": b"15AP", версия, число записей
+    записи: ENTRY + имя в UTF-8
+    данные: каждая запись с границы DATA_ALIGN байт
+
+Во время работы пакет открывается через mmap, а QImage ссылается прямо на
+отображенную память без копирования, поэтому ни при запуске, ни при
+входе в уровень PNG не декодируются. Если пакета нет или исходный файл
+изменился после сборки, используется сам файл (удобно при разработке).
+"""
+import ctypes
+import mmap
+import os
+import struct
+import sys
+
+from PyQt6 import sip
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QFontDatabase
+
+PACK_PATH = "assets.pack"
+IMAGES_DIR = "images"
+FONT_PATH = os.path.join("Fonts", "PressStart2P-Regular.ttf")
+BACKGROUND_PATH = os.path.join(IMAGES_DIR, "background.png")
+
+MAGIC = b"15AP"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+# длина имени, вид, ширина, высота, байт в строке, формат QImage,
+# смещение, размер, размер и mtime_ns исходного файла
+ENTRY = struct.Struct("<HBIIIIQQQq")
+IMAGE, RAW = 0, 1
+DATA_ALIGN = 64
+
+# Исходники фишек 3072x3072: в декодированном виде это 36 МБ на фишку
+TILE_MAX_PIXELS = 512
+PACK_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+def mapped_image(buffer, offset, size, width, height, bytes_per_line, image_format):
+    """QImage поверх участка буфера mmap (без копирования)
+
+    Буфер должен жить, пока жива картинка: QImage хранит только адрес.
+    """
+    address = ctypes.addressof(ctypes.c_char.from_buffer(buffer, offset))
+    return QImage(sip.voidptr(address, size), width, height, bytes_per_line,
+                  QImage.Format(image_format))
+
+
+def variant_name(path, pixels):
+    """Имя записи с картинкой, заранее отмасштабированной под клетку pixels"""
+    return f"{path}@{pixels}"
+
+
+class AssetPack:
+    """Открытый через mmap пакет ресурсов"""
+
+    _shared = None
+    _opened = False
+
+    def __init__(self, path=PACK_PATH):
+        with open(path, 'rb') as f:
+            # Копирование при записи: страницы общие с файлом, а буфер доступен
+            # на запись, поэтому из него можно получить адрес для QImage
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, count = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: неизвестный формат пакета ресурсов")
+        self.entries = {}
+        offset = HEADER.size
+        for _ in range(count):
+            entry = ENTRY.unpack_from(self.buffer, offset)
+            offset += ENTRY.size
+            name = bytes(self.buffer[offset:offset + entry[0]]).decode('utf-8')
+            offset += entry[0]
+            self.entries[name] = entry
+        self.stale = set()
+
+    @classmethod
+    def shared(cls):
+        """Пакет приложения (открывается один раз) или None, если его нет"""
+        if not cls._opened:
+            cls._opened = True
+            if os.path.exists(PACK_PATH):
+                try:
+                    cls._shared = cls(PACK_PATH)
+                except (OSError, ValueError, struct.error) as e:
+                    print(f"Пакет ресурсов не открыт, используются файлы: {e}")
+        return cls._shared
+
+    def entry(self, name, source):
+        """Запись пакета, если она соответствует исходному файлу source"""
+        entry = self.entries.get(name)
+        if entry is None or source in self.stale:
+            return None
+        try:
+            stat = os.stat(source)
+        except OSError:
+            # Исходника нет (поставка без картинок) - пакет единственный источник
+            return entry
+        if (stat.st_size, stat.st_mtime_ns) != (entry[8], entry[9]):
+            print(f"{source} изменился после сборки пакета ресурсов, читается файл")
+            self.stale.add(source)
+            return None
+        return entry
+
+    def image(self, name, source=None):
+        """QImage поверх памяти пакета (без копирования) или None"""
+        entry = self.entry(name, source or name)
+        if entry is None or entry[1] != IMAGE:
+            return None
+        _, _, width, height, bytes_per_line, image_format, offset, size, _, _ = entry
+        return mapped_image(self.buffer, offset, size, width, height, bytes_per_line, image_format)
+
+    def data(self, name):
+        entry = self.entry(name, name)
+        if entry is None:
+            return None
+        offset, size = entry[6], entry[7]
+        return bytes(self.buffer[offset:offset + size])
+
+
+def load_image(path):
+    """Картинка из пакета ресурсов, иначе из файла; None, если ее нет нигде"""
+    pack = AssetPack.shared()
+    image = pack.image(path) if pack else None
+    if image is None and os.path.exists(path):
+        image = QImage(path)
+    if image is None or image.isNull():
+        return None
+    return image
+
+
+def load_scaled_image(path, pixels):
+    """Готовый вариант под клетку pixels из пакета или None"""
+    pack = AssetPack.shared()
+    return pack.image(variant_name(path, pixels), path) if pack else None
+
+
+def asset_exists(path):
+    pack = AssetPack.shared()
+    return (pack is not None and path in pack.entries) or os.path.exists(path)
+
+
+def load_font(path):
+    """Регистрирует шрифт из пакета или файла; id шрифта или -1"""
+    pack = AssetPack.shared()
+    data = pack.data(path) if pack else None
+    if data is not None:
+        return QFontDatabase.addApplicationFontFromData(data)
+    return QFontDatabase.addApplicationFont(path)
+
+
+def build_pack(path=PACK_PATH, tile_pixels=(), progress=None):
+    """Собирает пакет из images/*.png и шрифта"""
+    entries = []    # (имя, вид, ширина, высота, байт в строке, формат, данные, исходник)
+
+    def add_image(name, image, source):
+        image = image.convertToFormat(PACK_FORMAT)
+        data = image.constBits().asstring(image.sizeInBytes())
+        entries.append((name, IMAGE, image.width(), image.height(), image.bytesPerLine(),
+                        PACK_FORMAT.value, data, source))
+
+    for file_name in sorted(os.listdir(IMAGES_DIR)):
+        if not file_name.endswith('.png'):
+            continue
+        source = os.path.join(IMAGES_DIR, file_name)
+        original = QImage(source)
+        if original.isNull():
+            print(f"Пропущено, не декодируется: {source}")
+            continue
+        if source != BACKGROUND_PATH:
+            for pixels in tile_pixels:
+                add_image(variant_name(source, pixels),
+                          original.scaled(pixels, pixels, Qt.AspectRatioMode.KeepAspectRatio,
+                                          Qt.TransformationMode.SmoothTransformation), source)
+            if max(original.width(), original.height()) > TILE_MAX_PIXELS:
+                original = original.scaled(TILE_MAX_PIXELS, TILE_MAX_PIXELS,
+                                           Qt.AspectRatioMode.KeepAspectRatio,
+                                           Qt.TransformationMode.SmoothTransformation)
+        add_image(source, original, source)
+        if progress:
+            progress(source)
+
+    if os.path.exists(FONT_PATH):
+        with open(FONT_PATH, 'rb') as f:
+            entries.append((FONT_PATH, RAW, 0, 0, 0, 0, f.read(), FONT_PATH))
+
+    names = [entry[0].encode('utf-8') for entry in entries]
+    offset = HEADER.size + sum(ENTRY.size + len(name) for name in names)
+    index = [HEADER.pack(MAGIC, VERSION, len(entries))]
+    blobs = []
+    for name, (_, kind, width, height, bytes_per_line, image_format, data, source) in zip(names, entries):
+        padding = -offset % DATA_ALIGN
+        offset += padding
+        stat = os.stat(source)
+        index.append(ENTRY.pack(len(name), kind, width, height, bytes_per_line, image_format,
+                                offset, len(data), stat.st_size, stat.st_mtime_ns) + name)
+        blobs.append(b"\0" * padding + data)
+        offset += len(data)
+
+    temporary = path + ".tmp"
+    with open(temporary, 'wb') as f:
+        f.writelines(index)
+        f.writelines(blobs)
+    os.replace(temporary, path)
+    return len(entries), offset
+
+
+def main():
+    import argparse
+    from GameScreen import GameScreen
+
+    sizes = sorted({config['btn_size'] for config in GameScreen.SIZE_CONFIG.values()}
+                   | {GameScreen.DEFAULT_SIZE_CONFIG['btn_size']})
+    parser = argparse.ArgumentParser(description="Сборка пакета ресурсов")
+    parser.add_argument("--output", default=PACK_PATH)
+    parser.add_argument("--tile-sizes", type=int, nargs="*", default=sizes,
+                        help="размеры клеток, под которые фишки готовятся заранее")
+    parser.add_argument("--dpr", type=float, nargs="+", default=[1.0],
+                        help="devicePixelRatio экранов, для которых готовить фишки")
+    args = parser.parse_args()
+
+    tile_pixels = sorted({round(size * dpr) for size in args.tile_sizes for dpr in args.dpr})
+    count, size = build_pack(args.output, tile_pixels,
+                             progress=lambda source: print(source, file=sys.stderr))
+    print(f"{args.output}: {count} записей, {size / 1024 / 1024:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,111 @@
+from collections import OrderedDict
+
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QPixmap, QPainter
-from PyQt6.QtCore import Qt, QRect
-import os
+from PyQt6.QtCore import Qt, QRect, QTimer
+
+from AssetPack import load_image
+from Tracing import tracer
+
+
+class BackgroundSource:
+    """Фоновое изображение, общее для всех экранов
+
+    Картинка загружается один раз, а уже обрезанные под размер виджета
+    варианты (как background-size: cover) кэшируются по размеру и DPR.
+    Все экраны в QStackedWidget одного размера, поэтому обычно им хватает
+    одной закэшированной копии.
+    """
+
+    MAX_CACHED = 4
+    _sources = {}
+
+    def __init__(self, image):
+        with tracer.span("upload background"):
+            self.pixmap = QPixmap.fromImage(image)
+        self.cache = OrderedDict()
+
+    @classmethod
+    def shared(cls, image_path):
+        """Один источник на путь к файлу; None, если файла нет"""
+        if image_path not in cls._sources:
+            with tracer.span("decode background"):
+                image = load_image(image_path)
+            source = cls(image) if image is not None else None
+            if source is not None and source.pixmap.isNull():
+                source = None
+            cls._sources[image_path] = source
+        return cls._sources[image_path]
+
+    def covered(self, width, height, dpr, smooth):
+        """Фон ровно под размер виджета; быстрые (не сглаженные) варианты не кэшируются"""
+        key = (width, height, dpr)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        pixel_width = round(width * dpr)
+        pixel_height = round(height * dpr)
+        mode = Qt.TransformationMode.SmoothTransformation if smooth else Qt.TransformationMode.FastTransformation
+        # Масштабируем чтобы изображение заполнило весь виджет (может обрезаться)
+        with tracer.span("scale background", smooth=smooth):
+            scaled = self.pixmap.scaled(pixel_width, pixel_height,
+                                        Qt.AspectRatioMode.KeepAspectRatioByExpanding, mode)
+        # Центрируем обрезанное изображение
+        x = (scaled.width() - pixel_width) // 2
+        y = (scaled.height() - pixel_height) // 2
+        result = scaled.copy(QRect(x, y, pixel_width, pixel_height))
+        result.setDevicePixelRatio(dpr)
+
+        if smooth:
+            self.cache[key] = result
+            while len(self.cache) > self.MAX_CACHED:
+                self.cache.popitem(last=False)
+        return result
+
 
 class BackgroundWidget(QWidget):
     """Базовый виджет с фоновым изображением"""
 
+    # Сколько ждать после последнего изменения размера перед сглаженным масштабированием
+    RESIZE_SETTLE_MS = 150
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.background_pixmap = None
+        self.background = None
+        self.resizing = False
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.timeout.connect(self.finish_resize)
 
     def set_background(self, image_path):
-        if os.path.exists(image_path):
-            self.background_pixmap = QPixmap(image_path)
+        source = BackgroundSource.shared(image_path)
+        if source is not None:
+            self.background = source
             self.update()
 
+    def resizeEvent(self, event):
+        # Во время изменения размера рисуем быстрым масштабированием
+        self.resizing = True
+        self.resize_timer.start(self.RESIZE_SETTLE_MS)
+        super().resizeEvent(event)
+
+    def finish_resize(self):
+        self.resizing = False
+        self.update()
+
     def paintEvent(self, event):
         """Заполняет весь виджет изображением (как background-size: cover)"""
-        if self.background_pixmap and not self.background_pixmap.isNull():
+        if self.background is not None:
             painter = QPainter(self)
-            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
-
-            widget_rect = self.rect()
-            pixmap_size = self.background_pixmap.size()
-
-            # Масштабируем чтобы изображение заполнило весь виджет (может обрезаться)
-            scaled_pixmap = self.background_pixmap.scaled(
-                widget_rect.size(),
-                Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                Qt.TransformationMode.SmoothTransformation
-            )
-
-            # Центрируем обрезанное изображение
-            x = (scaled_pixmap.width() - widget_rect.width()) // 2
-            y = (scaled_pixmap.height() - widget_rect.height()) // 2
+            pixmap = self.background.covered(self.width(), self.height(),
+                                             self.devicePixelRatioF(), not self.resizing)
+            painter.drawPixmap(event.rect(), pixmap, self.physical_rect(event.rect()))
 
-            painter.drawPixmap(widget_rect, scaled_pixmap, QRect(x, y, widget_rect.width(), widget_rect.height()))
+        super().paintEvent(event)
 
-        super().paintEvent(event)
\ No newline at end of file
+    def physical_rect(self, rect):
+        """Прямоугольник в пикселях закэшированного фона"""
+        dpr = self.devicePixelRatioF()
+        return QRect(round(rect.x() * dpr), round(rect.y() * dpr),
+                     round(rect.width() * dpr), round(rect.height() * dpr))
@@ -0,0 +1,140 @@
+"""Пакетный решатель и бенчмарк
+
+Примеры:
+    python BatchSolve.py benchmarks/corpus_4x4.txt
+    python BatchSolve.py --generate 50 --size 4 --seed 7 --walk 60
+    python BatchSolve.py --generate 20 --size 4 --seed 7 --target 40
+    python BatchSolve.py benchmarks/corpus_3x3.txt --workers 1 > results.jsonl
+
+Файл задач: одна расстановка на строку, фишки через пробел (0 - пустая
+клетка), после двоеточия можно указать известную оптимальную длину.
+Строки, начинающиеся с '#', пропускаются. Результаты печатаются в stdout
+в формате JSONL по мере готовности, итоговая производительность - в stderr.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Board import Board, OPPOSITE
+from Generator import with_difficulty
+from Solver import Solver, default_heuristic
+
+# Решатели кэшируются на процесс, чтобы таблицы PDB открывались один раз
+_solvers = {}
+
+
+def parse_instances(lines):
+    """Разбирает строки файла задач в список (фишки, ожидаемая длина или None)"""
+    instances = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        tiles_part, _, expected = line.partition(':')
+        tiles = [int(value) for value in tiles_part.split()]
+        size = math.isqrt(len(tiles))
+        if size * size != len(tiles) or not Board.is_solvable(tiles, size):
+            raise ValueError(f"Строка {number}: некорректная или нерешаемая расстановка")
+        instances.append((tiles, int(expected) if expected.strip() else None))
+    return instances
+
+
+def random_walk_instances(size, count, seed, walk):
+    """Задачи случайным блужданием без немедленных возвратов"""
+    rng = random.Random(seed)
+    instances = []
+    for _ in range(count):
+        board = Board(size)
+        previous = -1
+        steps = 0
+        while steps < walk:
+            direction = rng.randrange(4)
+            if previous >= 0 and direction == OPPOSITE[previous]:
+                continue
+            if board.move_blank(direction):
+                previous = direction
+                steps += 1
+        instances.append((board.tiles(), None))
+    return instances
+
+
+def solve_instance(number, tiles, expected, max_nodes, time_limit):
+    """Решает одну задачу в рабочем процессе и возвращает запись для JSONL"""
+    size = math.isqrt(len(tiles))
+    key = (size, max_nodes, time_limit)
+    if key not in _solvers:
+        _solvers[key] = Solver(size, default_heuristic(size),
+                               max_nodes=max_nodes, time_limit=time_limit)
+    solution = _solvers[key].solve(tiles)
+    record = {
+        'id': number,
+        'size': size,
+        'status': solution.status,
+        'length': solution.length,
+        'nodes': solution.nodes,
+        'time': round(solution.elapsed, 6),
+        'heuristic': solution.heuristic,
+    }
+    if expected is not None:
+        record['expected'] = expected
+        record['ok'] = solution.length == expected
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетное решение задач и замер производительности")
+    parser.add_argument('file', nargs='?', help="файл с задачами")
+    parser.add_argument('--generate', type=int, metavar='N', help="сгенерировать N задач вместо файла")
+    parser.add_argument('--size', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--walk', type=int, default=60, help="длина случайного блуждания")
+    parser.add_argument('--target', type=int, default=None,
+                        help="генерировать задачи с оптимальной длиной около target")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-nodes', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    if args.generate and args.target:
+        rng = random.Random(args.seed)
+        instances = [(with_difficulty(args.size, args.target, rng), None)
+                     for _ in range(args.generate)]
+    elif args.generate:
+        instances = random_walk_instances(args.size, args.generate, args.seed, args.walk)
+    elif args.file:
+        with open(args.file, encoding='utf-8') as f:
+            instances = parse_instances(f)
+    else:
+        parser.error("нужен файл с задачами или --generate")
+
+    started = time.perf_counter()
+    records = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(solve_instance, number, tiles, expected,
+                                   args.max_nodes, args.time_limit)
+                   for number, (tiles, expected) in enumerate(instances, 1)]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+    wall = time.perf_counter() - started
+
+    nodes = sum(record['nodes'] for record in records)
+    solved = sum(1 for record in records if record['status'] == 'solved')
+    wrong = sum(1 for record in records if record.get('ok') is False)
+    cpu = sum(record['time'] for record in records)
+    print(f"Задач: {len(records)}, решено: {solved}, неверных длин: {wrong}", file=sys.stderr)
+    print(f"Время: {wall:.2f} с (сумма по задачам {cpu:.2f} с), процессов: {args.workers}",
+          file=sys.stderr)
+    print(f"Производительность: {nodes / wall if wall else 0:,.0f} узлов/с, "
+          f"{len(records) / wall if wall else 0:.2f} задач/с", file=sys.stderr)
+    return 1 if wrong else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+from array import array
+
+# Направления движения пустой клетки: вверх, вниз, влево, вправо
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+
+
+class Board:
+    """Модель игрового поля без зависимостей от Qt
+
+    Состояние хранится плоским массивом: cells[index] - номер фишки в клетке,
+    pos[tile] - индекс клетки, где лежит фишка (0 - пустая клетка).
+    Количество фишек не на своих местах и манхэттенское расстояние
+    пересчитываются за O(1) на каждом ходе.
+    """
+
+    def __init__(self, size, tiles=None):
+        self.size = size
+        self.count = size * size
+        typecode = 'B' if self.count <= 256 else 'H'
+
+        # Целевые координаты для каждой фишки (фишка t лежит в клетке t - 1)
+        self.goal_row = array('b' if size < 128 else 'h', [0] * self.count)
+        self.goal_col = array('b' if size < 128 else 'h', [0] * self.count)
+        for tile in range(1, self.count):
+            self.goal_row[tile] = (tile - 1) // size
+            self.goal_col[tile] = (tile - 1) % size
+        self.goal_row[0] = size - 1
+        self.goal_col[0] = size - 1
+
+        self.cells = array(typecode, [0] * self.count)
+        self.pos = array(typecode, [0] * self.count)
+
+        if tiles is None:
+            tiles = list(range(1, self.count)) + [0]
+        self.load(tiles)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Создает поле из списка строк (как старый GameScreen.board)"""
+        return cls(len(rows), [value for row in rows for value in row])
+
+    def load(self, tiles):
+        """Загружает расстановку фишек и пересчитывает метрики"""
+        if len(tiles) != self.count or sorted(tiles) != list(range(self.count)):
+            raise ValueError(f"Некорректная расстановка для поля {self.size}x{self.size}")
+
+        for index, tile in enumerate(tiles):
+            self.cells[index] = tile
+            self.pos[tile] = index
+        self.empty = self.pos[0]
+
+        self.misplaced = 0
+        self.manhattan = 0
+        for index, tile in enumerate(tiles):
+            if tile != 0:
+                if tile != index + 1:
+                    self.misplaced += 1
+                self.manhattan += self.distance(tile, index)
+
+    def reset(self):
+        """Возвращает поле в собранное состояние"""
+        self.load(list(range(1, self.count)) + [0])
+
+    def distance(self, tile, index):
+        """Манхэттенское расстояние фишки от клетки index до своего места"""
+        row, col = divmod(index, self.size)
+        return abs(row - self.goal_row[tile]) + abs(col - self.goal_col[tile])
+
+    @property
+    def empty_pos(self):
+        return divmod(self.empty, self.size)
+
+    def get(self, i, j):
+        return self.cells[i * self.size + j]
+
+    def tiles(self):
+        return list(self.cells)
+
+    def rows(self):
+        size = self.size
+        return [list(self.cells[i * size:(i + 1) * size]) for i in range(size)]
+
+    def key(self):
+        """Упакованное хешируемое представление состояния"""
+        return self.cells.tobytes()
+
+    def copy(self):
+        return Board(self.size, self.tiles())
+
+    def is_solved(self):
+        return self.misplaced == 0
+
+    def can_move(self, i, j):
+        """Можно ли сдвинуть фишку (i, j) в пустую клетку"""
+        empty_i, empty_j = divmod(self.empty, self.size)
+        return abs(i - empty_i) + abs(j - empty_j) == 1
+
+    def move(self, i, j):
+        """Сдвигает фишку (i, j) в пустую клетку. Возвращает True, если ход сделан"""
+        if not (0 <= i < self.size and 0 <= j < self.size) or not self.can_move(i, j):
+            return False
+        self.move_index(i * self.size + j)
+        return True
+
+    def move_index(self, index):
+        """Сдвигает фишку из клетки index в пустую клетку без проверок (O(1))"""
+        tile = self.cells[index]
+        target = self.empty
+
+        # Обновляем метрики только для сдвинутой фишки
+        self.manhattan += self.distance(tile, target) - self.distance(tile, index)
+        self.misplaced += (tile != target + 1) - (tile != index + 1)
+
+        self.cells[target] = tile
+        self.pos[tile] = target
+        self.cells[index] = 0
+        self.pos[0] = index
+        self.empty = index
+
+    def neighbor(self, direction):
+        """Индекс клетки, куда уйдет пустая клетка при ходе direction, или -1"""
+        i, j = divmod(self.empty, self.size)
+        di, dj = DIRECTIONS[direction]
+        ni, nj = i + di, j + dj
+        if 0 <= ni < self.size and 0 <= nj < self.size:
+            return ni * self.size + nj
+        return -1
+
+    def move_blank(self, direction):
+        """Двигает пустую клетку в направлении direction. Возвращает True при успехе"""
+        index = self.neighbor(direction)
+        if index < 0:
+            return False
+        self.move_index(index)
+        return True
+
+    def direction_to(self, index):
+        """Направление пустой клетки для хода фишкой из клетки index"""
+        diff = index - self.empty
+        if diff == -self.size:
+            return UP
+        if diff == self.size:
+            return DOWN
+        if diff == -1 and index // self.size == self.empty // self.size:
+            return LEFT
+        if diff == 1 and index // self.size == self.empty // self.size:
+            return RIGHT
+        return -1
+
+    @staticmethod
+    def is_solvable(tiles, size):
+        """Проверка четности за O(N): можно ли собрать такую расстановку
+
+        Расстановка решаема, если четность перестановки (пустая клетка - тоже
+        элемент) совпадает с четностью расстояния пустой клетки до своего места.
+        """
+        count = size * size
+        goal = [(tile - 1) if tile else count - 1 for tile in tiles]
+        seen = bytearray(count)
+        transpositions = 0
+        for start in range(count):
+            if seen[start]:
+                continue
+            length = 0
+            index = start
+            while not seen[index]:
+                seen[index] = 1
+                index = goal[index]
+                length += 1
+            transpositions += length - 1
+        empty_i, empty_j = divmod(tiles.index(0), size)
+        blank_distance = (size - 1 - empty_i) + (size - 1 - empty_j)
+        return transpositions % 2 == blank_distance % 2
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.size == other.size and self.cells == other.cells
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"Board({self.size}, {self.tiles()})"
@@ -0,0 +1,300 @@
+import time
+from array import array
+from collections import deque
+
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, QEvent, QRect, QSize, QVariantAnimation, QEasingCurve, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen
+
+from AssetCache import tile_cache
+from Theme import theme_engine
+from TileFaces import TileFaces
+from Tracing import tracer
+
+
+class BoardWidget(QWidget):
+    """Игровое поле, нарисованное одним виджетом
+
+    Вместо N² кнопок фишки рисуются в paintEvent из заранее отмасштабированных
+    картинок общего кэша (AssetCache), клик определяется по координатам.
+    После хода перерисовываются только две клетки, которые он затронул.
+
+    Сдвиг фишки анимируется одним QVariantAnimation на все поле. Виджет рисует
+    собственную копию клеток (shown), которая отстает от модели на очередь
+    еще не показанных ходов: модель меняется сразу, а ходы, пришедшие во время
+    анимации, ждут в очереди. Чем длиннее очередь, тем короче анимация; если
+    очередь переполнена, поле сразу перескакивает к состоянию модели.
+
+    Цвета клеток берутся из палитры текущей темы (Theme). Фишкам без
+    картинки рисуются процедурные лица (TileFaces); если картинок не хватает
+    на все поле, процедурные лица получают все фишки.
+    """
+
+    tile_clicked = pyqtSignal(int, int)
+
+    SPACING = 1
+    PADDING = 5
+    ANIMATION_DURATION = 120
+    MIN_ANIMATION_DURATION = 30
+    MAX_PENDING = 3
+
+    def __init__(self, board, tile_size, image_source=None, parent=None):
+        super().__init__(parent)
+        self.board = board
+        self.tile_size = tile_size
+        self.faces = TileFaces(board.size)
+        # Источник картинок: объект с методом pixmap(фишка, размер, dpr)
+        self.default_source = tile_cache if board.count - 1 <= tile_cache.count else self.faces
+        self.image_source = image_source or self.default_source
+        self.hover_index = -1
+        self.highlight_index = -1
+
+        # Отображаемое состояние и анимация сдвига
+        self.shown = array(board.cells.typecode, board.cells)
+        self.instant = False
+        self.pending = deque()
+        self.moving = None          # (фишка, откуда, куда)
+        self.progress = 1.0
+        self.animation = QVariantAnimation(self)
+        self.animation.setStartValue(0.0)
+        self.animation.setEndValue(1.0)
+        self.animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self.animation.valueChanged.connect(self.on_animation_frame)
+        self.animation.finished.connect(self.on_animation_finished)
+
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.setFixedSize(self.sizeHint())
+
+    def sizeHint(self):
+        side = 2 * self.PADDING + self.board.size * (self.tile_size + self.SPACING) - self.SPACING
+        return QSize(side, side)
+
+    def tile_size_for(self, side):
+        """Наибольший размер клетки, при котором поле влезает в квадрат side"""
+        return (side - 2 * self.PADDING + self.SPACING) // self.board.size - self.SPACING
+
+    def set_tile_size(self, tile_size):
+        if tile_size == self.tile_size:
+            return
+        self.tile_size = tile_size
+        self.setFixedSize(self.sizeHint())
+        self.update()
+
+    def set_image_source(self, image_source):
+        self.image_source = image_source or self.default_source
+        self.update()
+
+    def cell_rect(self, index):
+        i, j = divmod(index, self.board.size)
+        step = self.tile_size + self.SPACING
+        return QRect(self.PADDING + j * step, self.PADDING + i * step, self.tile_size, self.tile_size)
+
+    def index_at(self, x, y):
+        """Клетка под точкой (x, y) или -1, если точка между клетками или вне поля"""
+        step = self.tile_size + self.SPACING
+        x -= self.PADDING
+        y -= self.PADDING
+        if x < 0 or y < 0:
+            return -1
+        j, dx = divmod(int(x), step)
+        i, dy = divmod(int(y), step)
+        if i >= self.board.size or j >= self.board.size or dx >= self.tile_size or dy >= self.tile_size:
+            return -1
+        return i * self.board.size + j
+
+    def update_cells(self, indices):
+        """Перерисовывает только указанные клетки"""
+        for index in indices:
+            if index >= 0:
+                self.update(self.cell_rect(index))
+
+    def sync(self):
+        """Сбрасывает анимации и показывает текущее состояние модели целиком"""
+        self.animation.stop()
+        self.pending.clear()
+        self.moving = None
+        self.shown = array(self.board.cells.typecode, self.board.cells)
+        self.update()
+
+    def set_instant(self, instant):
+        """Мгновенный режим (для повторов): ходы показываются без анимации"""
+        self.instant = instant
+        if instant:
+            self.finish_animations()
+
+    def animate_move(self, src, dst):
+        """Фишка из клетки src переехала в dst (модель уже обновлена)"""
+        if self.instant:
+            self.apply_move(src, dst)
+            self.update_cells((src, dst))
+            return
+        self.pending.append((src, dst))
+        if len(self.pending) > self.MAX_PENDING:
+            # Ввод сильно опережает анимацию - догоняем одним кадром
+            self.finish_animations()
+        elif self.moving is None:
+            self.start_next_animation()
+
+    def apply_move(self, src, dst):
+        tile = self.shown[src]
+        self.shown[dst] = tile
+        self.shown[src] = 0
+        return tile
+
+    def start_next_animation(self):
+        if not self.pending:
+            self.moving = None
+            return
+        src, dst = self.pending.popleft()
+        tile = self.apply_move(src, dst)
+        self.moving = (tile, src, dst)
+        self.progress = 0.0
+        # Каждый ожидающий ход ускоряет текущую анимацию
+        duration = self.ANIMATION_DURATION // (1 + len(self.pending))
+        self.animation.setDuration(max(self.MIN_ANIMATION_DURATION, duration))
+        self.animation.start()
+
+    def finish_animations(self):
+        """Применяет все ожидающие ходы без анимации"""
+        self.animation.stop()
+        touched = []
+        if self.moving:
+            touched.extend(self.moving[1:])
+            self.moving = None
+        while self.pending:
+            src, dst = self.pending.popleft()
+            self.apply_move(src, dst)
+            touched.extend((src, dst))
+        self.update_cells(touched)
+
+    def on_animation_frame(self, value):
+        if self.moving:
+            self.progress = value
+            _, src, dst = self.moving
+            self.update(self.cell_rect(src).united(self.cell_rect(dst)))
+
+    def on_animation_finished(self):
+        if self.moving:
+            _, src, dst = self.moving
+            self.moving = None
+            self.update(self.cell_rect(src).united(self.cell_rect(dst)))
+        self.start_next_animation()
+
+    def moving_rect(self):
+        """Текущее положение сдвигаемой фишки"""
+        _, src, dst = self.moving
+        start = self.cell_rect(src)
+        end = self.cell_rect(dst)
+        return start.translated(round((end.x() - start.x()) * self.progress),
+                                round((end.y() - start.y()) * self.progress))
+
+    def set_highlight(self, index):
+        old = self.highlight_index
+        self.highlight_index = index
+        self.update_cells((old, index))
+
+    def scaled_pixmap(self, tile):
+        return self.image_source.pixmap(tile, self.tile_size, self.devicePixelRatioF())
+
+    def paintEvent(self, event):
+        with tracer.span("BoardWidget.paintEvent"):
+            self.paint_board(event)
+        # Кадр готов - для трассировки это конец задержки клика
+        tracer.frame_painted()
+
+    def paint_board(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), theme_engine.color('board'))
+
+        # Рисуем только клетки, попавшие в область перерисовки
+        size = self.board.size
+        step = self.tile_size + self.SPACING
+        area = event.rect()
+        first_row = max(0, (area.top() - self.PADDING) // step)
+        last_row = min(size - 1, (area.bottom() - self.PADDING) // step)
+        first_col = max(0, (area.left() - self.PADDING) // step)
+        last_col = min(size - 1, (area.right() - self.PADDING) // step)
+
+        moving_to = self.moving[2] if self.moving else -1
+        for i in range(first_row, last_row + 1):
+            for j in range(first_col, last_col + 1):
+                index = i * size + j
+                if index == moving_to:
+                    # Клетка назначения пуста, пока фишка едет
+                    self.paint_cell(painter, index, 0, self.cell_rect(index))
+                else:
+                    self.paint_cell(painter, index, self.shown[index], self.cell_rect(index))
+
+        if self.moving:
+            rect = self.moving_rect()
+            if rect.intersects(area):
+                self.paint_cell(painter, moving_to, self.moving[0], rect)
+
+    def paint_cell(self, painter, index, tile, rect):
+        inner = rect.adjusted(0, 0, -1, -1)
+        colors = theme_engine.current.colors
+
+        if tile == 0:
+            painter.setPen(QPen(colors['empty_border'], 1))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRect(inner)
+            return
+
+        pixmap = self.scaled_pixmap(tile)
+        if pixmap is not None and self.image_source is not self.faces:
+            painter.fillRect(rect, colors['image'])
+            border = colors['image_border']
+        else:
+            # Картинки нет - процедурное лицо с номером
+            if pixmap is None:
+                pixmap = self.faces.pixmap(tile, self.tile_size, self.devicePixelRatioF())
+            border = colors['number_border']
+        size = pixmap.deviceIndependentSize()
+        painter.drawPixmap(rect.x() + (rect.width() - round(size.width())) // 2,
+                           rect.y() + (rect.height() - round(size.height())) // 2, pixmap)
+
+        if index == self.highlight_index:
+            painter.setPen(QPen(colors['hover'], 3))
+            inner = rect.adjusted(1, 1, -2, -2)
+        elif index == self.hover_index:
+            painter.setPen(QPen(colors['hover'], 2))
+            inner = rect.adjusted(1, 1, -1, -1)
+        else:
+            painter.setPen(QPen(border, 1))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRect(inner)
+
+    def changeEvent(self, event):
+        # Смена темы приложения: палитра уже новая, нужен только новый кадр
+        if event.type() == QEvent.Type.StyleChange:
+            self.update()
+        super().changeEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            index = self.index_at(event.position().x(), event.position().y())
+            if index >= 0:
+                pressed_ns = time.perf_counter_ns()
+                empty = self.board.empty
+                self.tile_clicked.emit(*divmod(index, self.board.size))
+                # Задержку меряем только для принятых ходов: клик мимо
+                # не перерисовывает поле и дождался бы чужого кадра
+                if self.board.empty != empty:
+                    tracer.input_event("click", pressed_ns)
+                return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        index = self.index_at(event.position().x(), event.position().y())
+        if index != self.hover_index:
+            old = self.hover_index
+            self.hover_index = index
+            self.update_cells((old, index))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        old = self.hover_index
+        self.hover_index = -1
+        self.update_cells((old,))
+        super().leaveEvent(event)
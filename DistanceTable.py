@@ -0,0 +1,178 @@
+"""Полная таблица оптимальных расстояний для поля 3x3
+
+Сборка (один раз, несколько секунд):
+    python DistanceTable.py
+
+Для каждой из 9! перестановок хранится один байт - точное число ходов до
+сборки (255 для нерешаемых расстановок). Индекс - ранг перестановки по коду
+Лемера. Таблица открывается через mmap, подсказка - это пара обращений к ней.
+"""
+import mmap
+import os
+import sys
+import time
+
+from PatternDB import PDB_DIR
+
+SIZE = 3
+CELLS = SIZE * SIZE
+UNREACHABLE = 255
+TABLE_PATH = os.path.join(PDB_DIR, "3x3_distances.bin")
+
+FACTORIALS = [1] * (CELLS + 1)
+for _n in range(1, CELLS + 1):
+    FACTORIALS[_n] = FACTORIALS[_n - 1] * _n
+
+
+def lehmer_rank(cells):
+    """Ранг перестановки по коду Лемера"""
+    result = 0
+    count = len(cells)
+    for i in range(count - 1):
+        value = cells[i]
+        smaller = 0
+        for j in range(i + 1, count):
+            if cells[j] < value:
+                smaller += 1
+        result += smaller * FACTORIALS[count - 1 - i]
+    return result
+
+
+def build_table(progress=None):
+    """Обход в ширину от собранного поля по слоям"""
+    neighbors = []
+    for index in range(CELLS):
+        i, j = divmod(index, SIZE)
+        neighbors.append([ni * SIZE + nj for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+                          if 0 <= ni < SIZE and 0 <= nj < SIZE])
+
+    table = bytearray([UNREACHABLE]) * FACTORIALS[CELLS]
+    goal = bytes(list(range(1, CELLS)) + [0])
+    table[lehmer_rank(goal)] = 0
+    frontier = [goal]
+    depth = 0
+    started = time.perf_counter()
+    while frontier:
+        depth += 1
+        following = []
+        for state in frontier:
+            empty = state.index(0)
+            for cell in neighbors[empty]:
+                moved = bytearray(state)
+                moved[empty] = moved[cell]
+                moved[cell] = 0
+                code = lehmer_rank(moved)
+                if table[code] == UNREACHABLE:
+                    table[code] = depth
+                    following.append(bytes(moved))
+        frontier = following
+        if progress:
+            progress(depth, len(frontier), time.perf_counter() - started)
+    return table
+
+
+def write_table(table, path=TABLE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(table)
+    os.replace(tmp_path, path)
+
+
+class DistanceTable:
+    """Точные расстояния до сборки для 3x3 через mmap
+
+    Годится и как эвристика для Solver (reset/move, как у
+    ManhattanLinearConflict): с точным расстоянием IDA* идет прямо по
+    оптимальному пути. Состояния у нее нет, поэтому одну таблицу могут
+    одновременно использовать несколько поисков.
+    """
+
+    name = "exact 3x3"
+    # Путь к файлу -> открытая таблица (одно отображение на процесс)
+    _tables = {}
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def shared(cls, path=None):
+        """Общая таблица для всех экранов; None, пока она не построена
+
+        Без path - TABLE_PATH на момент вызова (бенчмарк подменяет его на
+        таблицу во временном каталоге).
+        """
+        path = path or TABLE_PATH
+        if path not in cls._tables:
+            table = cls.load(path)
+            if table is None:
+                return None
+            cls._tables[path] = table
+        return cls._tables[path]
+
+    @classmethod
+    def load(cls, path=TABLE_PATH):
+        """Открывает таблицу, если она построена, иначе None"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) != FACTORIALS[CELLS]:
+            data.close()
+            return None
+        return cls(data)
+
+    def distance(self, cells):
+        return self.data[lehmer_rank(cells)]
+
+    def reset(self, cells):
+        return self.distance(cells)
+
+    def move(self, cells, tile, src, dst):
+        return self.distance(cells)
+
+    def next_move(self, board):
+        """Индекс фишки, ход которой приближает к сборке на один ход, или -1"""
+        cells = board.tiles()
+        current = self.distance(cells)
+        if current == 0 or current == UNREACHABLE:
+            return -1
+        empty = board.empty
+        for direction in range(4):
+            index = board.neighbor(direction)
+            if index < 0:
+                continue
+            cells[empty], cells[index] = cells[index], 0
+            if self.distance(cells) == current - 1:
+                return index
+            cells[index], cells[empty] = cells[empty], 0
+        return -1
+
+    def solution(self, board):
+        """Оптимальная последовательность клеток для кликов"""
+        board = board.copy()
+        indices = []
+        while True:
+            index = self.next_move(board)
+            if index < 0:
+                return indices
+            board.move_index(index)
+            indices.append(index)
+
+    def close(self):
+        self.data.close()
+
+
+def main():
+    def progress(depth, frontier, elapsed):
+        print(f"  глубина {depth}: {frontier} состояний, {elapsed:.1f} с", flush=True)
+
+    table = build_table(progress)
+    write_table(table)
+    reachable = sum(1 for value in table if value != UNREACHABLE)
+    print(f"{TABLE_PATH}: {reachable} достижимых состояний")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import time
+
+
+class GameClock:
+    """Время партии по монотонным часам perf_counter_ns
+
+    Время не накапливается по тикам таймера, а вычисляется как разность
+    показаний часов, поэтому задержки цикла событий на него не влияют.
+    """
+
+    def __init__(self):
+        self.offset_ns = 0          # время, набранное до последней паузы
+        self.started_ns = None      # показание часов при запуске (None - на паузе)
+
+    @property
+    def running(self):
+        return self.started_ns is not None
+
+    def start(self):
+        if self.started_ns is None:
+            self.started_ns = time.perf_counter_ns()
+
+    def pause(self):
+        if self.started_ns is not None:
+            self.offset_ns += time.perf_counter_ns() - self.started_ns
+            self.started_ns = None
+
+    def reset(self, seconds=0.0):
+        """Останавливает часы и выставляет набранное время"""
+        self.offset_ns = round(seconds * 1_000_000_000)
+        self.started_ns = None
+
+    def elapsed_ns(self):
+        if self.started_ns is None:
+            return self.offset_ns
+        return self.offset_ns + time.perf_counter_ns() - self.started_ns
+
+    def elapsed(self):
+        """Набранное время в секундах"""
+        return self.elapsed_ns() / 1_000_000_000
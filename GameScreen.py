@@ -1,46 +1,107 @@
-import os
-import json
 import random
+import time
 from PyQt6.QtWidgets import (QPushButton, QVBoxLayout, QHBoxLayout,
-                             QWidget, QLabel, QGridLayout, QSizePolicy, QStackedWidget, QMainWindow)
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QFont, QIcon, QPixmap
+                             QLabel, QComboBox, QWidget, QSizePolicy, QFileDialog)
+from PyQt6.QtCore import Qt, QEvent, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
 
 from Background import BackgroundWidget
-from VictoryScreen import VictoryScreen
+from Board import Board
+from BoardWidget import BoardWidget
+from DistanceTable import DistanceTable
+from GameClock import GameClock
+from Generator import random_solvable, with_difficulty
+from MoveLog import MoveLog
+from PatternDB import PARTITIONS
+from PictureTiles import PictureTiles
+from ResultsStore import results_store
+from SessionJournal import session_journal, UNDO, REDO
+from Solver import ManhattanLinearConflict
+from SolverWorker import SolverJob
+from Tracing import tracer
 
 class GameScreen(BackgroundWidget):
-    """Базовый игровой экран"""
+    """Базовый игровой экран
+
+    Экран переиспользуется между играми: init_game() начинает новую игру
+    на том же поле. Переходы между экранами делает ScreenManager по сигналам.
+    """
+
+    back_requested = pyqtSignal()
+    game_won = pyqtSignal(int, float, int)   # ходы, время, размер поля
+
+    # Бюджет решателя для подсказки и автосборки
+    SOLVER_MAX_NODES = 3_000_000
+    SOLVER_TIME_LIMIT = 10.0
+    # С 4x4 поиск идет в отдельном процессе, чтобы GIL не тормозил интерфейс
+    SOLVER_PROCESS_MIN_SIZE = 4
+    AUTOPLAY_INTERVAL = 150
+    # Обновление часов на экране: часто сразу после хода, раз в секунду в простое
+    CLOCK_FINE_MS = 100
+    CLOCK_COARSE_MS = 1000
+    CLOCK_IDLE_AFTER = 3.0
+    # Как часто время партии пишется в журнал, пока игрок не ходит
+    JOURNAL_CLOCK_MS = 10_000
+    # Скорости повтора: интервал между ходами в мс, 0 - сразу до конца
+    REPLAY_SPEEDS = {"1x": 300, "4x": 75, "16x": 20, "Максимум": 0}
+
+    # Наибольший размер клетки для разных уровней; в маленьком окне клетки
+    # уменьшаются, чтобы поле влезло (но не меньше MIN_TILE_SIZE)
+    SIZE_CONFIG = {
+        3: {'btn_size': 150},
+        4: {'btn_size': 120},
+        5: {'btn_size': 120}
+    }
+    DEFAULT_SIZE_CONFIG = {'btn_size': 90}
+    MIN_TILE_SIZE = 16
 
     def __init__(self, grid_size, parent=None):
         super().__init__(parent)
         self.grid_size = grid_size
-        self.tiles = []
-        self.board = []
-        self.empty_pos = (grid_size - 1, grid_size - 1)
+        # Желаемая длина оптимального решения; None - равномерно случайное поле
+        self.difficulty = None
+        self.board = Board(grid_size)
         self.moves = 0
-        self.elapsed_time = 0
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
-
-        # ПРЕДЗАГРУЗКА КАРТИНОК В ПАМЯТЬ
-        self.tile_icons = {}
-        self.tile_pixmaps = {}
-        self.preload_tile_images()
+        # Время партии считают часы, таймер только обновляет надпись
+        self.clock = GameClock()
+        self.last_activity = 0.0
+        self.display_timer = QTimer(self)
+        self.display_timer.setSingleShot(True)
+        self.display_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.display_timer.timeout.connect(self.update_time)
+        # Без ходов журнал не пополняется, поэтому время в простое - по таймеру
+        self.journal_timer = QTimer(self)
+        self.journal_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.journal_timer.timeout.connect(self.save_session)
+        # Экран победы - с паузой после последнего хода; новая партия или
+        # выход с экрана его отменяют
+        self.victory_timer = QTimer(self)
+        self.victory_timer.setSingleShot(True)
+        self.victory_timer.setInterval(200)
+        self.victory_timer.timeout.connect(self.show_victory_screen)
+
+        # Автосборка: очередь клеток, по которым нужно "кликнуть"
+        self.solution_queue = []
+        # Партия, доигранная автосборкой, не попадает в результаты
+        self.assisted = False
+        self.autoplay_timer = QTimer()
+        self.autoplay_timer.timeout.connect(self.play_next_move)
+        # Для 3x3 подсказки берутся из полной таблицы расстояний без поиска;
+        # ее строят явно (python DistanceTable.py), без нее работает поиск
+        self.distance_table = DistanceTable.shared() if grid_size == 3 else None
+        # Текущая фоновая задача поиска и что сделать с ее результатом
+        self.search_job = None
+        self.search_action = None
+        # Запись ходов текущей партии (для отмены, повтора и сохранения)
+        self.log = None
+        # Повтор сохраненной партии
+        self.replay_moves = None
+        self.replay_timer = QTimer()
+        self.replay_timer.timeout.connect(self.replay_step)
+        # Своя картинка, нарезанная на фишки (None - стандартные картинки)
+        self.picture = None
 
         self.setup_ui()
-        self.init_game()
-
-    def preload_tile_images(self):
-        """Предзагружает все картинки в память"""
-        for i in range(1, 25):
-            image_path = f"images/{i}.png"
-            if os.path.exists(image_path):
-                pixmap = QPixmap(image_path)
-                self.tile_pixmaps[i] = pixmap
-                self.tile_icons[i] = QIcon(pixmap)
-            else:
-                print(f"Изображение не найдено: {image_path}")
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -51,28 +112,15 @@ class GameScreen(BackgroundWidget):
 
         self.time_label = QLabel("Время: 0:00.00")
         self.time_label.setFont(QFont("Arial", 18))
-        self.time_label.setStyleSheet("background: rgba(255, 255, 255, 0.7); padding: 3px; border-radius: 3px;")
+        self.time_label.setProperty("role", "badge")
 
         self.moves_label = QLabel(f"Ходы: {self.moves}")
         self.moves_label.setFont(QFont("Arial", 18))
-        self.moves_label.setStyleSheet("background: rgba(255, 255, 255, 0.7); padding: 3px; border-radius: 3px;")
+        self.moves_label.setProperty("role", "badge")
 
         back_btn = QPushButton("← Назад")
         back_btn.setFont(QFont("Arial", 18))
-        back_btn.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(255, 255, 255, 0.3);
-                border: 1px solid rgba(255, 255, 255, 0.5);
-                border-radius: 5px;
-                padding: 5px 10px;
-                color: black;
-            }
-            QPushButton:hover {
-                background-color: rgba(0, 0, 0, 0.3);
-                border: 1px solid rgba(255, 255, 255, 0.8);
-                color: #FFD700;
-            }
-        """)
+        back_btn.setProperty("role", "tool")
         back_btn.clicked.connect(self.go_back)
 
         info_layout.addWidget(back_btn)
@@ -81,90 +129,167 @@ class GameScreen(BackgroundWidget):
         info_layout.addSpacing(10)
         info_layout.addWidget(self.moves_label)
 
-        # Игровое поле
-        self.board_widget = QWidget()
-        self.board_widget.setStyleSheet("background: rgba(255, 255, 255, 0.1); border-radius: 5px; padding: 5px;")
-        self.grid_layout = QGridLayout(self.board_widget)
-        self.grid_layout.setSpacing(1)  # Уменьшили расстояние между клетками
-        self.grid_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Создаем клетки
+        # Подсказка и автосборка
+        action_layout = QHBoxLayout()
+
+        self.hint_btn = QPushButton("Подсказка")
+        self.solve_btn = QPushButton("Решить")
+        for btn in [self.hint_btn, self.solve_btn]:
+            btn.setFont(QFont("Arial", 14))
+            btn.setProperty("role", "tool")
+        self.hint_btn.clicked.connect(self.show_hint)
+        self.solve_btn.clicked.connect(self.solve_from_here)
+
+        self.undo_btn = QPushButton("↶")
+        self.redo_btn = QPushButton("↷")
+        for btn, tip in [(self.undo_btn, "Отменить ход (Ctrl+Z)"), (self.redo_btn, "Вернуть ход (Ctrl+Y)")]:
+            btn.setFont(QFont("Arial", 14))
+            btn.setProperty("role", "tool")
+            btn.setToolTip(tip)
+        self.undo_btn.clicked.connect(self.undo_move)
+        self.redo_btn.clicked.connect(self.redo_move)
+        QShortcut(QKeySequence.StandardKey.Undo, self, self.undo_move)
+        QShortcut(QKeySequence.StandardKey.Redo, self, self.redo_move)
+
+        self.picture_btn = QPushButton("Картинка...")
+        self.picture_btn.setFont(QFont("Arial", 14))
+        self.picture_btn.setProperty("role", "tool")
+        self.picture_btn.setToolTip("Собрать свою картинку вместо стандартных фишек")
+        self.picture_btn.clicked.connect(self.choose_picture)
+
+        # Выбор скорости виден только во время повтора
+        self.speed_box = QComboBox()
+        self.speed_box.setFont(QFont("Arial", 14))
+        self.speed_box.addItems(list(self.REPLAY_SPEEDS))
+        self.speed_box.currentTextChanged.connect(self.schedule_replay)
+        self.speed_box.hide()
+
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont("Arial", 12))
+        self.status_label.setProperty("role", "badge")
+        self.status_label.hide()
+
+        action_layout.addWidget(self.hint_btn)
+        action_layout.addWidget(self.solve_btn)
+        action_layout.addWidget(self.undo_btn)
+        action_layout.addWidget(self.redo_btn)
+        action_layout.addWidget(self.picture_btn)
+        action_layout.addWidget(self.speed_box)
+        action_layout.addStretch()
+        action_layout.addWidget(self.status_label)
+
+        # Игровое поле: размер клетки подбирается под свободное место
         self.create_tiles()
-        center_layout = QHBoxLayout()
-        center_layout.addStretch()
-        center_layout.addWidget(self.board_widget)
-        center_layout.addStretch()
 
         # Собираем все вместе
         layout.addLayout(info_layout)
-        layout.addStretch()
-        layout.addLayout(center_layout)
-        layout.addStretch()
+        layout.addLayout(action_layout)
+        layout.addWidget(self.board_area, 1)
 
         self.setLayout(layout)
 
     def create_tiles(self):
-        """Создает клетки """
-        # размеры для разных уровней
-        size_config = {
-            3: {'btn_size': 150, 'font_size': 16},
-            4: {'btn_size': 120, 'font_size': 14},
-            5: {'btn_size': 120, 'font_size': 12}
-        }
-        config = size_config.get(self.grid_size, {'btn_size': 90, 'font_size': 14})
-
-        for i in range(self.grid_size):
-            row = []
-            for j in range(self.grid_size):
-                btn = QPushButton()
-                btn.setFixedSize(config['btn_size'], config['btn_size'])
-                btn.setFont(QFont("Arial", config['font_size'], QFont.Weight.Bold))
-                btn.clicked.connect(lambda checked, x=i, y=j: self.tile_clicked(x, y))
-
-                # Минималистичный стиль
-                btn.setStyleSheet("""
-                    QPushButton {
-                        margin: 0px;
-                        padding: 0px;
-                        border: 1px solid rgba(255, 255, 255, 0.3);
-                        background-color: rgba(255, 255, 255, 0.1);
-                    }
-                    QPushButton:hover {
-                        border: 2px solid #FFD700;
-                    }
-                """)
-
-                self.grid_layout.addWidget(btn, i, j)
-                row.append(btn)
-            self.tiles.append(row)
-
-    def init_game(self):
-        """Инициализация игрового поля"""
-        self.board = []
-        counter = 1
-        for i in range(self.grid_size):
-            row = []
-            for j in range(self.grid_size):
-                if counter < self.grid_size * self.grid_size:
-                    row.append(counter)
-                else:
-                    row.append(0)
-                counter += 1
-            self.board.append(row)
-
-        self.empty_pos = (self.grid_size - 1, self.grid_size - 1)
+        """Создает поле, которое само рисует клетки (картинки - из общего кэша)
+
+        Поле не входит в компоновку: оно лежит в board_area по центру, поэтому
+        не задает минимальный размер окна и уменьшается вместе с ним.
+        """
+        config = self.SIZE_CONFIG.get(self.grid_size, self.DEFAULT_SIZE_CONFIG)
+        self.max_tile_size = config['btn_size']
+
+        self.board_area = QWidget()
+        self.board_area.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.board_area.installEventFilter(self)
+        self.board_widget = BoardWidget(self.board, self.max_tile_size, parent=self.board_area)
+        self.board_widget.tile_clicked.connect(self.tile_clicked)
+
+    def eventFilter(self, watched, event):
+        if watched is self.board_area and event.type() == QEvent.Type.Resize:
+            self.center_board()
+        return super().eventFilter(watched, event)
+
+    def fit_board(self):
+        """Размер клетки под текущее свободное место"""
+        side = min(self.board_area.width(), self.board_area.height())
+        tile_size = min(self.max_tile_size, self.board_widget.tile_size_for(side))
+        self.board_widget.set_tile_size(max(self.MIN_TILE_SIZE, tile_size))
+        self.center_board()
+
+    def center_board(self):
+        board = self.board_widget
+        board.move((self.board_area.width() - board.width()) // 2,
+                   (self.board_area.height() - board.height()) // 2)
+
+    def finish_resize(self):
+        # Клетки пересчитываются, когда размер окна устоялся: на каждый размер
+        # картинки масштабируются заново
+        super().finish_resize()
+        self.fit_board()
+
+    @property
+    def elapsed_time(self):
+        """Время партии в секундах (точное, не зависит от тиков таймера)"""
+        return self.clock.elapsed()
+
+    @elapsed_time.setter
+    def elapsed_time(self, seconds):
+        self.clock.reset(seconds)
+
+    def init_game(self, difficulty=None):
+        """Инициализация игрового поля (новая игра на том же экране)
+
+        Сложность (длина оптимального решения) учитывается только там, где
+        длины известны точно, - на 3x3 с таблицей расстояний.
+        """
+        self.stop_clock()
+        self.victory_timer.stop()
+        self.stop_autoplay()
+        self.cancel_search()
+        self.stop_replay()
+        self.status_label.hide()
         self.moves = 0
         self.elapsed_time = 0
-        self.update_display()
+        self.assisted = False
+        self.difficulty = difficulty if self.distance_table else None
         self.shuffle_board()
+        session_journal.start(self.log)
+        self.start_clock()
+
+    def start_clock(self):
+        self.clock.start()
+        self.last_activity = time.perf_counter()
+        self.journal_timer.start(self.JOURNAL_CLOCK_MS)
+        self.update_time()
 
-        # Запускаем таймер
-        self.timer.start(100)  # Обновление каждые 100 мс
+    def stop_clock(self):
+        self.clock.pause()
+        self.display_timer.stop()
+        self.journal_timer.stop()
+        self.update_time()
 
     def update_time(self):
-        """Обновление времени"""
-        self.elapsed_time += 0.1
-        self.time_label.setText(f"Время: {self.format_time(self.elapsed_time)}")
+        """Обновляет надпись со временем и планирует следующее обновление
+
+        Сразу после хода надпись обновляется каждые CLOCK_FINE_MS, в простое -
+        раз в секунду на границе секунды. Пока экран скрыт или окно свернуто,
+        обновления не планируются (часы при этом идут).
+        """
+        elapsed_ms = self.clock.elapsed_ns() // 1_000_000
+        self.time_label.setText(f"Время: {self.format_time(elapsed_ms / 1000)}")
+        if not self.clock.running or not self.isVisible() or self.window().isMinimized():
+            return
+        idle = time.perf_counter() - self.last_activity > self.CLOCK_IDLE_AFTER
+        step = self.CLOCK_COARSE_MS if idle else self.CLOCK_FINE_MS
+        self.display_timer.start(step - elapsed_ms % step)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.fit_board()
+        self.update_time()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.display_timer.stop()
 
     def format_time(self, seconds):
         """Форматирование времени"""
@@ -173,167 +298,339 @@ class GameScreen(BackgroundWidget):
         return f"{minutes}:{seconds:05.2f}"
 
     def shuffle_board(self):
-        """Перемешивает поле"""
-        for _ in range(100 * self.grid_size):
-            i, j = self.empty_pos
-            possible_moves = []
-
-            for di, dj in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                ni, nj = i + di, j + dj
-                if 0 <= ni < self.grid_size and 0 <= nj < self.grid_size:
-                    possible_moves.append((ni, nj))
-
-            if possible_moves:
-                move_i, move_j = random.choice(possible_moves)
-                self.board[i][j], self.board[move_i][move_j] = \
-                    self.board[move_i][move_j], self.board[i][j]
-                self.empty_pos = (move_i, move_j)
+        """Перемешивает поле: равномерно по решаемым расстановкам или под заданную сложность"""
+        # Зерно сохраняется вместе с результатом, чтобы партию можно было воспроизвести
+        self.seed = random.randrange(2 ** 31)
+        rng = random.Random(self.seed)
+        if self.difficulty is None:
+            tiles = random_solvable(self.grid_size, rng)
+        else:
+            tiles = with_difficulty(self.grid_size, self.difficulty, rng,
+                                    distance_table=self.distance_table, verify_nodes=0)
+        self.board.load(tiles)
+        self.log = MoveLog(self.grid_size, tiles, self.seed)
+        self.optimal = self.distance_table.distance(tiles) if self.distance_table else None
+        # Случайная расстановка может оказаться уже собранной (на малых полях)
+        if self.board.is_solved() and self.difficulty is None:
+            self.shuffle_board()
+            return
 
         self.update_display()
 
     def tile_clicked(self, i, j):
-        """Обработка клика по клетке"""
-        empty_i, empty_j = self.empty_pos
-
-        if ((abs(i - empty_i) == 1 and j == empty_j) or
-                (abs(j - empty_j) == 1 and i == empty_i)):
-
-            self.board[empty_i][empty_j] = self.board[i][j]
-            self.board[i][j] = 0
-            self.empty_pos = (i, j)
-
-            self.moves += 1
+        """Обработка клика по клетке: ход игрока прерывает автосборку"""
+        self.stop_autoplay()
+        self.move_tile(i, j)
+
+    def move_tile(self, i, j):
+        """Сдвигает фишку (i, j), если она рядом с пустой клеткой"""
+        with tracer.span("GameScreen.tile_clicked", grid_size=self.grid_size):
+            old_empty = self.board.empty
+            direction = self.board.direction_to(i * self.grid_size + j)
+            with tracer.span("Board.move"):
+                moved = self.board.move(i, j)
+            if moved:
+                self.log.append(direction)
+                self.after_move(old_empty, direction)
+
+    def undo_move(self):
+        """Отменяет последний ход (он больше не считается)"""
+        if self.replay_moves is not None or self.check_win() or not self.log.can_undo():
+            return
+        self.stop_autoplay()
+        old_empty = self.board.empty
+        self.board.move_blank(self.log.undo())
+        self.after_move(old_empty, UNDO)
+
+    def redo_move(self):
+        """Повторяет отмененный ход"""
+        if self.replay_moves is not None or self.check_win() or not self.log.can_redo():
+            return
+        self.stop_autoplay()
+        old_empty = self.board.empty
+        self.board.move_blank(self.log.redo())
+        self.after_move(old_empty, REDO)
+
+    def after_move(self, old_empty, event):
+        # Позиция изменилась - идущий поиск больше не актуален
+        self.cancel_search()
+        # Ходы - длина записи партии: отмена ход убирает, повтор возвращает.
+        # Столько же ходов сохраняется в результатах и показывает повтор
+        self.moves = len(self.log)
+        if self.check_win():
+            # Время победы - момент последнего хода, а не показа экрана победы
+            self.stop_clock()
+        elif time.perf_counter() - self.last_activity > self.CLOCK_IDLE_AFTER:
+            # Часы были в режиме простоя - снова обновляем часто
+            self.last_activity = time.perf_counter()
+            self.update_time()
+        else:
+            self.last_activity = time.perf_counter()
+        session_journal.record(event, self.moves, self.elapsed_time)
+        self.board_widget.set_highlight(-1)
+        self.update_labels()
+        with tracer.span("BoardWidget.animate_move"):
+            self.board_widget.animate_move(self.board.empty, old_empty)
+
+        if self.check_win():
+            self.victory_timer.start()
+
+    def resume_game(self, session):
+        """Продолжает партию из журнала: поле восстанавливается проигрыванием записи"""
+        self.stop_clock()
+        self.victory_timer.stop()
+        self.stop_autoplay()
+        self.cancel_search()
+        self.stop_replay()
+        self.board.load(session.log.replay().tiles())
+        self.log = session.log
+        self.seed = session.log.seed
+        self.optimal = self.distance_table.distance(self.log.tiles) if self.distance_table else None
+        self.moves = len(self.log)
+        self.elapsed_time = session.elapsed_time
+        self.update_display()
+        self.show_status("Партия восстановлена")
+        session_journal.start(self.log, self.moves, self.elapsed_time)
+        self.start_clock()
+
+    def save_session(self):
+        """Записывает в журнал текущее время партии (по таймеру и перед выходом)"""
+        if self.clock.running:
+            session_journal.record(None, self.moves, self.elapsed_time)
+
+    def start_replay(self, log):
+        """Показывает сохраненную партию; скорость выбирается в speed_box"""
+        self.stop_clock()
+        self.victory_timer.stop()
+        self.stop_autoplay()
+        self.cancel_search()
+        try:
+            log.replay()
+        except ValueError as e:
+            self.show_status(str(e))
+            return
+        self.replay_moves = log.directions()
+        self.board.load(log.tiles)
+        self.moves = 0
+        self.elapsed_time = 0
+        self.update_time()
+        self.set_replay_mode(True)
+        self.update_display()
+        self.show_status(f"Повтор: {len(log)} ходов")
+        self.schedule_replay()
+
+    def set_replay_mode(self, replaying):
+        for widget in [self.hint_btn, self.solve_btn, self.undo_btn, self.redo_btn]:
+            widget.setVisible(not replaying)
+        self.speed_box.setVisible(replaying)
+        # Картинку во время повтора не меняем: повтор показывает партию как была
+        self.picture_btn.setEnabled(not replaying)
+        # Во время повтора клики по полю игнорируются
+        self.board_widget.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, replaying)
+
+    def schedule_replay(self):
+        if self.replay_moves is None:
+            return
+        interval = self.REPLAY_SPEEDS[self.speed_box.currentText()]
+        if interval == 0:
+            # Максимальная скорость: применяем все ходы и рисуем один раз
+            for direction in self.replay_moves:
+                self.board.move_blank(direction)
+                self.moves += 1
             self.update_display()
-
-            if self.check_win():
-                QTimer.singleShot(200, self.show_victory_screen)
-
-    def update_display(self):
-        """Оптимизированное обновление отображения"""
+            self.finish_replay()
+            return
+        # Если ходы чаще длительности анимации, показываем их без нее
+        self.board_widget.set_instant(interval < self.board_widget.ANIMATION_DURATION)
+        self.replay_timer.start(interval)
+
+    def replay_step(self):
+        direction = next(self.replay_moves, None)
+        if direction is None:
+            self.finish_replay()
+            return
+        old_empty = self.board.empty
+        self.board.move_blank(direction)
+        self.moves += 1
+        self.update_labels()
+        self.board_widget.animate_move(self.board.empty, old_empty)
+
+    def finish_replay(self):
+        self.replay_timer.stop()
+        self.show_status(f"Повтор окончен: {self.moves} ходов")
+
+    def stop_replay(self):
+        if self.replay_moves is None:
+            return
+        self.replay_timer.stop()
+        self.replay_moves = None
+        self.board_widget.set_instant(False)
+        self.set_replay_mode(False)
+
+    def start_search(self, action):
+        """Запускает поиск в фоне; action(solution) вызывается в GUI-потоке"""
+        self.cancel_search()
+        job = SolverJob(self.grid_size, self.board.tiles(),
+                        max_nodes=self.SOLVER_MAX_NODES, time_limit=self.SOLVER_TIME_LIMIT,
+                        use_process=self.grid_size >= self.SOLVER_PROCESS_MIN_SIZE)
+        # Слоты - методы экрана: лямбда с задачей внутри замкнула бы
+        # задачу на ее же сигналы, и такие задачи не освобождались бы
+        job.signals.progress.connect(self.on_search_progress)
+        job.signals.finished.connect(self.on_search_finished)
+        job.signals.failed.connect(self.on_search_failed)
+        self.search_job = job
+        self.search_action = action
+        self.show_status("Поиск решения...")
+        job.start()
+
+    def cancel_search(self):
+        if self.search_job:
+            self.search_job.cancel()
+            self.search_job = None
+            self.search_action = None
+
+    def is_current_search(self):
+        """Сигнал пришел от текущей задачи поиска (а не от отмененной)"""
+        return self.search_job is not None and self.sender() is self.search_job.signals
+
+    def on_search_progress(self, nodes, rate, bound, elapsed):
+        if self.is_current_search():
+            self.show_status(f"Поиск: порог {bound}, {nodes} узлов, {rate / 1000:.0f}K узлов/с")
+
+    def on_search_failed(self, message):
+        if self.is_current_search():
+            self.search_job = None
+            self.search_action = None
+            self.show_status(message)
+
+    def on_search_finished(self, solution):
+        # Результат отмененной или устаревшей задачи игнорируем
+        if not self.is_current_search():
+            return
+        action = self.search_action
+        self.search_job = None
+        self.search_action = None
+        if not solution.solved:
+            message = f"Решение не найдено: {solution.nodes} узлов, {solution.elapsed:.1f} с"
+            if solution.heuristic == ManhattanLinearConflict.name and self.grid_size in PARTITIONS:
+                # Баз шаблонов нет - подсказываем, как их построить
+                message += f". Базы шаблонов: python PatternDB.py --size {self.grid_size}"
+            self.show_status(message)
+            return
+        self.show_status(f"Оптимум: {solution.length} ходов ({solution.nodes} узлов, "
+                         f"{solution.elapsed * 1000:.0f} мс)")
+        action(solution)
+
+    def show_hint(self):
+        """Подсвечивает фишку, которой нужно сходить по оптимальному решению"""
+        if self.check_win():
+            return
+        if self.distance_table:
+            self.highlight_tile(self.distance_table.next_move(self.board))
+            return
+        self.start_search(lambda solution: self.highlight_tile(solution.tile_indices(self.board)[0]))
+
+    def solve_from_here(self):
+        """Собирает поле по оптимальному решению с текущей позиции"""
+        if self.check_win() or self.autoplay_timer.isActive():
+            return
+        if self.distance_table:
+            self.start_autoplay(self.distance_table.solution(self.board))
+        else:
+            self.start_search(lambda solution: self.start_autoplay(solution.tile_indices(self.board)))
+
+    def start_autoplay(self, indices):
+        self.assisted = True
+        self.solution_queue = indices
+        self.autoplay_timer.start(self.AUTOPLAY_INTERVAL)
+
+    def play_next_move(self):
+        """Делает следующий ход автосборки"""
+        if not self.solution_queue:
+            self.stop_autoplay()
+            return
+        i, j = divmod(self.solution_queue.pop(0), self.grid_size)
+        if not self.board.can_move(i, j):
+            # Позиция разошлась с решением - дальше играть его нельзя
+            self.stop_autoplay()
+            return
+        self.move_tile(i, j)
+
+    def stop_autoplay(self):
+        self.autoplay_timer.stop()
+        self.solution_queue = []
+
+    def choose_picture(self):
+        """Выбор своей картинки; если картинка уже выбрана - возврат к стандартным"""
+        if self.picture is not None:
+            self.set_picture(None)
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Картинка для головоломки", "",
+                                              "Картинки (*.png *.jpg *.jpeg *.bmp *.gif *.webp)")
+        if path:
+            self.set_picture(path)
+
+    def set_picture(self, path):
+        """Фишки из картинки path (нарезка в фоне, с кэшем на диске)"""
+        self.picture = PictureTiles(path, self.grid_size) if path else None
+        if self.picture is not None:
+            self.picture.ready.connect(self.board_widget.update)
+            self.picture.failed.connect(self.on_picture_failed)
+        self.board_widget.set_image_source(self.picture)
+        self.picture_btn.setText("Убрать картинку" if path else "Картинка...")
+
+    def on_picture_failed(self, message):
+        """Картинку не удалось нарезать или открыть: обратно к стандартным фишкам"""
+        self.set_picture(None)
+        self.show_status(message)
+
+    def show_status(self, text):
+        self.status_label.setText(text)
+        self.status_label.show()
+
+    def highlight_tile(self, index):
+        """Выделяет фишку рамкой до следующего хода"""
+        self.board_widget.set_highlight(index)
+
+    def update_labels(self):
         self.moves_label.setText(f"Ходы: {self.moves}")
+        if self.distance_table:
+            self.show_status(f"До сборки: {self.distance_table.distance(self.board.tiles())} ходов")
 
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                value = self.board[i][j]
-                btn = self.tiles[i][j]
-
-                if value == 0:
-                    # Пустая клетка
-                    btn.setText("")
-                    btn.setIcon(QIcon())
-                    btn.setStyleSheet("background-color: transparent; border: 1px solid rgba(255,255,255,0.1);")
-                    btn.setEnabled(False)
-                else:
-                    # Используем предзагруженные иконки
-                    if value in self.tile_icons:
-                        btn.setIcon(self.tile_icons[value])
-                        btn.setIconSize(btn.size())
-                        btn.setText("")
-                        btn.setStyleSheet(
-                            "background-color: rgba(255,255,255,0.05); border: 1px solid rgba(255,255,255,0.3);")
-                    else:
-                        # Fallback на цифры
-                        btn.setText(str(value))
-                        btn.setIcon(QIcon())
-                        btn.setStyleSheet("""
-                             background-color: rgba(135,206,235,0.8); 
-                             border: 1px solid #4682B4; 
-                             color: black; 
-                             font-weight: bold;
-                         """)
-                    btn.setEnabled(True)
-
+    def update_display(self):
+        """Полная перерисовка поля (после перемешивания)"""
+        self.update_labels()
+        self.board_widget.highlight_index = -1
+        self.board_widget.sync()
 
     def check_win(self):
-        """Проверяет, выиграл ли игрок"""
-        counter = 1
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                if i == self.grid_size - 1 and j == self.grid_size - 1:
-                    if self.board[i][j] != 0:
-                        return False
-                else:
-                    if self.board[i][j] != counter:
-                        return False
-                    counter += 1
-        return True
+        """Проверяет, выиграл ли игрок (O(1) по счетчику фишек не на местах)"""
+        return self.board.is_solved()
 
     def show_victory_screen(self):
         """Показывает экран победы"""
-        self.timer.stop()
-
-        # Сохраняем результат
-        self.save_best_result()
-
-        victory_screen = VictoryScreen(self.moves, self.elapsed_time, self.grid_size)
+        self.stop_clock()
+        self.stop_autoplay()
+        self.cancel_search()
 
-        parent = self.parent()
-        while parent and not isinstance(parent, QStackedWidget):
-            parent = parent.parent()
+        # Сохраняем результат (кроме собранных автосборкой), партия из журнала больше не нужна
+        if not self.assisted:
+            self.save_best_result()
+        session_journal.finish()
 
-        if parent:
-            parent.addWidget(victory_screen)
-            parent.setCurrentWidget(victory_screen)
-
-            # ТОЛЬКО подключение кнопки "В меню"
-            victory_screen.menu_btn.clicked.connect(lambda: self.go_to_menu(parent))
+        self.game_won.emit(self.moves, self.elapsed_time, self.grid_size)
 
     def save_best_result(self):
-        """Сохраняет лучший результат"""
-        try:
-            # Пытаемся загрузить существующие результаты
-            if os.path.exists('best_results.json'):
-                with open('best_results.json', 'r') as f:
-                    best_results = json.load(f)
-            else:
-                best_results = {}
-
-            level_key = str(self.grid_size)
-
-            # Проверяем, является ли текущий результат лучшим
-            if level_key not in best_results:
-                best_results[level_key] = {
-                    'moves': self.moves,
-                    'time': self.elapsed_time
-                }
-            else:
-                current_best = best_results[level_key]
-                # Считаем лучшим результат с меньшим количеством ходов
-                if self.moves < current_best['moves']:
-                    best_results[level_key] = {
-                        'moves': self.moves,
-                        'time': self.elapsed_time
-                    }
-                # При одинаковых ходах - лучшее время
-                elif self.moves == current_best['moves'] and self.elapsed_time < current_best['time']:
-                    best_results[level_key] = {
-                        'moves': self.moves,
-                        'time': self.elapsed_time
-                    }
-
-            # Сохраняем результаты
-            with open('best_results.json', 'w') as f:
-                json.dump(best_results, f)
-
-        except Exception as e:
-            print(f"Ошибка при сохранении результатов: {e}")
-
-
-
-
-    def go_to_menu(self, stacked_widget):
-        """Возврат в главное меню"""
-        self.timer.stop()
-        stacked_widget.setCurrentIndex(1)
-        stacked_widget.removeWidget(self)
+        """Записывает игру в историю (запись идет в фоновом потоке)"""
+        results_store.record(self.grid_size, self.moves, self.elapsed_time,
+                             self.seed, self.optimal, self.log)
 
     def go_back(self):
         """Возврат к выбору уровня"""
-        self.timer.stop()
-
-        parent = self.parent()
-        while parent and not isinstance(parent, QStackedWidget):
-            parent = parent.parent()
-        if parent:
-            parent.setCurrentIndex(1)
-            parent.removeWidget(self)
+        self.save_session()
+        self.stop_clock()
+        self.victory_timer.stop()
+        self.stop_autoplay()
+        self.cancel_search()
+        self.stop_replay()
+        self.back_requested.emit()
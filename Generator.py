@@ -0,0 +1,81 @@
+import random
+
+from Board import Board, OPPOSITE
+from Solver import ManhattanLinearConflict, Solver
+
+
+def random_solvable(size, rng=random):
+    """Равномерно случайная решаемая расстановка
+
+    Перестановка тасуется целиком; если она нерешаема, меняются местами две
+    первые непустые фишки. Это взаимно однозначно отображает нерешаемые
+    расстановки на решаемые, поэтому распределение остается равномерным.
+    """
+    tiles = list(range(size * size))
+    rng.shuffle(tiles)
+    if not Board.is_solvable(tiles, size):
+        first, second = [index for index, tile in enumerate(tiles[:3]) if tile != 0][:2]
+        tiles[first], tiles[second] = tiles[second], tiles[first]
+    return tiles
+
+
+def with_difficulty(size, target, rng=random, distance_table=None, verify_nodes=20_000,
+                    attempts=5, max_steps=None):
+    """Расстановка с оптимальной длиной решения около target
+
+    Случайное блуждание без возвратов от собранного поля, пока оценка не
+    дойдет до target. Из attempts попыток возвращается расстановка с
+    длиной, ближайшей к target.
+
+    Точна длина только для 3x3 с таблицей расстояний. Для остальных
+    размеров это оценка: эвристика дает нижнюю границу, а решатель с
+    бюджетом verify_nodes на 4x4 и больше почти никогда не успевает ее
+    уточнить, так что настоящий оптимум может быть заметно длиннее
+    (на 4x4 при target=20 - около 30). Поэтому в игре сложность
+    выбирается только для 3x3, а для больших полей функция годится лишь
+    для наборов BatchSolve, где длину потом проверяет решатель.
+    """
+    max_steps = max_steps or 20 * target + 100
+    heuristic = ManhattanLinearConflict(size)
+    verifier = Solver(size, max_nodes=verify_nodes) if verify_nodes else None
+    best = None
+    best_gap = None
+
+    for _ in range(attempts):
+        board = Board(size)
+        cells = board.tiles()
+        heuristic.reset(cells)
+        previous = -1
+        for _ in range(max_steps):
+            direction = rng.randrange(4)
+            if previous >= 0 and direction == OPPOSITE[previous]:
+                continue
+            index = board.neighbor(direction)
+            if index < 0:
+                continue
+            tile = cells[index]
+            cells[board.empty], cells[index] = tile, 0
+            estimate = heuristic.move(cells, tile, index, board.empty)
+            board.move_index(index)
+            previous = direction
+
+            if distance_table:
+                length = distance_table.distance(cells)
+            elif estimate < target:
+                continue
+            else:
+                length = estimate
+                if verifier:
+                    solution = verifier.solve(board)
+                    if solution.solved:
+                        length = solution.length
+
+            gap = abs(length - target)
+            if best_gap is None or gap < best_gap:
+                best, best_gap = board.tiles(), gap
+            if gap == 0:
+                return best
+            if not distance_table:
+                # Дальше блуждание только удаляется от цели - начинаем заново
+                break
+    return best or random_solvable(size, rng)
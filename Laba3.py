@@ -1,21 +1,37 @@
+# Первым: при импорте StartupProfile запоминает время, с которого идет отсчет
+# фаз, если момент старта процесса узнать не удалось (не Linux)
+from StartupProfile import StartupProfiler
+
 import sys
 import os
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QStackedWidget)
-from PyQt6.QtCore import  QTimer
+import argparse
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QMessageBox)
+from PyQt6.QtCore import QEvent, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 
-from GameScreen import GameScreen
+from AssetPack import asset_exists
+from Tracing import tracer
 from StartScreen import StartScreen
-from LevelScreen import LevelScreen
+from Theme import theme_engine
 
 
 class Game15(QMainWindow):
-    """Главное окно приложения"""
+    """Главное окно приложения
+
+    До первого кадра строится только стартовый экран. Остальные экраны,
+    шрифт заголовка и подготовка картинок - в finish_setup(), когда
+    стартовый экран уже нарисован; модули игровых экранов импортируются там же.
+    """
 
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
         self.setWindowTitle("Игра в 15")
         self.setMinimumSize(700, 700)
         self.background_image = "images/background.png"
+        self.profiler = profiler
+        self.level_screen = None
+        self.screens = None
+        self.first_painted = False
         self.setup_ui()
         self.set_background()
 
@@ -23,66 +39,206 @@ class Game15(QMainWindow):
         self.stacked_widget = QStackedWidget()
 
         self.start_screen = StartScreen()
-        self.level_screen = LevelScreen()
-
         self.stacked_widget.addWidget(self.start_screen)
-        self.stacked_widget.addWidget(self.level_screen)
+        self.start_screen.start_button.clicked.connect(self.show_level_screen)
+        # Первый кадр стартового экрана запускает отложенную часть запуска
+        self.start_screen.installEventFilter(self)
 
         self.setCentralWidget(self.stacked_widget)
-        self.connect_signals()
+        QShortcut(QKeySequence("Ctrl+T"), self, self.switch_theme)
 
     def set_background(self):
         """Устанавливает фоновое изображение для всех экранов"""
-        if os.path.exists(self.background_image):
-            # Устанавливаем фон для всех экранов
-            self.start_screen.set_background(self.background_image)
-            self.level_screen.set_background(self.background_image)
-        else:
+        if not asset_exists(self.background_image):
             print(f"Фоновое изображение не найдено: {self.background_image}")
+            return
+        for screen in [self.start_screen, self.level_screen]:
+            if screen is not None:
+                screen.set_background(self.background_image)
+
+    def eventFilter(self, watched, event):
+        if watched is self.start_screen and event.type() == QEvent.Type.Paint and not self.first_painted:
+            self.first_painted = True
+            # Срабатывает после того, как кадр дорисован и показан
+            QTimer.singleShot(0, self.on_first_paint)
+        return super().eventFilter(watched, event)
+
+    def on_first_paint(self):
+        self.start_screen.removeEventFilter(self)
+        if self.profiler:
+            self.profiler.mark("первый кадр")
+        self.finish_setup()
+        if self.profiler:
+            # Замер запуска: отчет и выход, без диалога продолжения партии
+            self.profiler.mark("отложенные экраны")
+            self.profiler.report()
+            QApplication.quit()
+            return
+        self.offer_resume()
+
+    def finish_setup(self):
+        """Строит экран уровней и менеджер экранов (один раз)"""
+        if self.screens is not None:
+            return
+        with tracer.span("Game15 deferred setup"):
+            from AssetCache import tile_cache
+            from GameScreen import GameScreen
+            from LevelScreen import LevelScreen
+            from ScreenManager import ScreenManager
+
+            self.start_screen.load_custom_font()
+            self.level_screen = LevelScreen()
+            self.stacked_widget.addWidget(self.level_screen)
+            self.set_background()
+            self.screens = ScreenManager(self.stacked_widget, self.level_screen, self.background_image)
+            self.connect_signals()
+
+            # Пока виден стартовый экран, картинки фишек готовятся в фоне
+            tile_sizes = [config['btn_size'] for config in GameScreen.SIZE_CONFIG.values()]
+            tile_cache.warm_up(tile_sizes, self.devicePixelRatioF())
+
+    def switch_theme(self):
+        """Следующая тема оформления; экраны не пересобираются"""
+        with tracer.span("theme switch"):
+            theme_engine.next_theme()
 
     def connect_signals(self):
-
-        self.start_screen.start_button.clicked.connect(self.show_level_screen)
-
         for size, button in self.level_screen.buttons.items():
             button.clicked.connect(lambda checked, s=size: self.start_game(s))
+        self.level_screen.custom_btn.clicked.connect(
+            lambda: self.start_game(self.level_screen.custom_size()))
+        self.level_screen.leaderboard_panel.replay_requested.connect(self.replay_game)
 
     def show_level_screen(self):
-        """Показать экран выбора уровня"""
-        # Обновляем результаты на экране выбора уровня
-        self.level_screen.update_results()
-        self.stacked_widget.setCurrentIndex(1)
+        """Показать экран выбора уровня (результаты обновляет ScreenManager)"""
+        self.finish_setup()
+        self.screens.show_level()
 
     def update_level_screen(self):
         """Обновляет экран выбора уровня"""
-        self.level_screen.update_results()
+        if self.level_screen is not None:
+            self.level_screen.update_results()
+
+    def offer_resume(self):
+        """Если прошлый запуск оборвался посреди партии, предлагает ее продолжить"""
+        from SessionJournal import session_journal
+        session = session_journal.load()
+        if session is None:
+            return
+        size = session.log.size
+        answer = QMessageBox.question(
+            self, "Незаконченная игра",
+            f"Продолжить игру {size}x{size}? Ходов: {session.moves}, "
+            f"время: {self.level_screen.format_time(session.elapsed_time)}")
+        if answer != QMessageBox.StandardButton.Yes:
+            session_journal.discard()
+            return
+        try:
+            self.screens.resume_game(session)
+        except ValueError as e:
+            # Контрольные суммы сошлись, но ходы не проигрываются - журнал
+            # выбрасываем и остаемся на стартовом экране
+            session_journal.discard()
+            QMessageBox.warning(self, "Незаконченная игра", f"Журнал партии поврежден: {e}")
+
+    def current_game_screen(self):
+        """Текущий экран, если это игровой экран, иначе None"""
+        if self.screens is None:
+            return None
+        from GameScreen import GameScreen
+        screen = self.stacked_widget.currentWidget()
+        return screen if isinstance(screen, GameScreen) else None
+
+    def changeEvent(self, event):
+        # Свернутое окно не перерисовывает часы, развернутое - сразу догоняет
+        if event.type() == QEvent.Type.WindowStateChange:
+            screen = self.current_game_screen()
+            if screen is not None:
+                screen.update_time()
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        # Время текущей партии - в журнал, чтобы продолжить с того же места
+        screen = self.current_game_screen()
+        if screen is not None:
+            screen.save_session()
+        super().closeEvent(event)
+
+    def replay_game(self, game_id):
+        """Повтор партии из истории результатов"""
+        from ResultsStore import results_store
+        try:
+            log = results_store.game_log(game_id)
+        except ValueError as e:
+            QMessageBox.warning(self, "Повтор партии", f"Запись партии повреждена: {e}")
+            return
+        if log is not None:
+            self.screens.show_replay(log)
 
     def start_game(self, grid_size):
         """Запуск игры с выбранным размером поля"""
-        # Показываем индикатор загрузки
-        self.level_screen.show_loading(grid_size)
-
-        # Запускаем игру с небольшой задержкой
-        QTimer.singleShot(100, lambda: self.create_game_screen(grid_size))
-
-
-    def create_game_screen(self, grid_size):
-        """Создает и показывает игровой экран"""
-        game_screen = GameScreen(grid_size)
-        self.stacked_widget.addWidget(game_screen)
-        self.stacked_widget.setCurrentWidget(game_screen)
-
-        # Устанавливаем фон для игрового экрана
-        game_screen.set_background(self.background_image)
-
-        # Скрываем индикатор загрузки
-        self.level_screen.hide_loading()
+        # Экран уровня переиспользуется, перемешивание мгновенное
+        self.finish_setup()
+        difficulty = self.level_screen.difficulty() if grid_size == 3 else None
+        self.screens.show_game(grid_size, difficulty)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Игра в 15", allow_abbrev=False)
+    parser.add_argument("--trace", nargs="?", const="trace.json", metavar="PATH",
+                        help="записать трейс задержек интерфейса (Chrome trace JSON)")
+    parser.add_argument("--watchdog", nargs="?", type=int, const=50, metavar="MS",
+                        # Строку из окружения argparse разбирает через type=int,
+                        # поэтому кривое значение - обычная ошибка аргумента
+                        default=os.environ.get("GAME15_WATCHDOG") or None,
+                        help="ловить зависания GUI дольше MS миллисекунд (стеки в stalls.folded);"
+                             " по умолчанию из GAME15_WATCHDOG")
+    parser.add_argument("--theme", choices=theme_engine.names(),
+                        help="тема оформления (переключается на ходу по Ctrl+T)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="напечатать время запуска до первого кадра по фазам и выйти")
+    # Остальные аргументы (например, -platform) разбирает Qt
+    return parser.parse_known_args()
 
 
 def main():
-    app = QApplication(sys.argv)
-    window = Game15()
+    profiler = StartupProfiler()
+    profiler.mark("интерпретатор и импорт")
+    args, qt_args = parse_args()
+    if args.trace:
+        tracer.enable(args.trace)
+    app = QApplication(sys.argv[:1] + qt_args)
+    # Таблица стилей ставится до создания виджетов: каждый полируется один раз
+    theme_engine.apply(args.theme)
+    profiler.mark("QApplication")
+
+    from ResultsStore import results_store
+    from SessionJournal import session_journal
+    if args.profile_startup:
+        # Замер запуска не создает и не читает настоящие результаты и журнал
+        import tempfile
+        scratch = tempfile.TemporaryDirectory(prefix="game15_profile_")
+        results_store.path = os.path.join(scratch.name, "results.db")
+        results_store.legacy_json = os.path.join(scratch.name, "best_results.json")
+        session_journal.path = os.path.join(scratch.name, "session.journal")
+    # Перед выходом дописываем результаты, которые еще стоят в очереди
+    app.aboutToQuit.connect(results_store.close)
+    app.aboutToQuit.connect(session_journal.close)
+    if args.watchdog:
+        from StallWatchdog import StallWatchdog
+        watchdog = StallWatchdog(args.watchdog)
+        watchdog.start()
+        # До записи трейса, чтобы зависания попали и в него
+        app.aboutToQuit.connect(watchdog.stop)
+    app.aboutToQuit.connect(tracer.write)
+    if args.profile_startup:
+        app.aboutToQuit.connect(scratch.cleanup)
+
+    with tracer.span("Game15 startup"):
+        window = Game15(profiler if args.profile_startup else None)
+    profiler.mark("окно и стартовый экран")
     window.show()
+    profiler.mark("show()")
     sys.exit(app.exec())
 
 
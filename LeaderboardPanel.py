@@ -0,0 +1,118 @@
+import time
+
+from PyQt6.QtWidgets import (QWidget, QLabel, QComboBox, QPushButton, QVBoxLayout, QHBoxLayout,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+
+
+class LeaderboardPanel(QWidget):
+    """Рекорды и история уровня с повтором выбранной партии
+
+    В режиме "Лучшие" строки - ResultsStore.leaderboard() (меньше ходов,
+    при равенстве - быстрее; индекс games_leaderboard), в режиме
+    "Последние" - ResultsStore.history() (индекс games_history). Уровень
+    и режим выбираются в level_box и view_box; при смене испускается
+    query_changed, и экран уровней подгружает строки. "Повтор" испускает
+    replay_requested с id игры, если у нее сохранена запись ходов.
+    """
+
+    query_changed = pyqtSignal()
+    replay_requested = pyqtSignal(int)
+
+    LIMIT = 10
+    VIEWS = ["Лучшие", "Последние"]
+    COLUMNS = ["Ходы", "Время", "Оптимум", "Дата"]
+
+    def __init__(self, levels, parent=None):
+        super().__init__(parent)
+        self.levels = sorted(levels)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+
+        layout = QVBoxLayout(self)
+        level_row = QHBoxLayout()
+        level_label = QLabel("Уровень:")
+        level_label.setFont(QFont("Arial", 11))
+        self.level_box = QComboBox()
+        self.level_box.setProperty("role", "size")
+        for level in self.levels:
+            self.level_box.addItem(f"{level}x{level}", level)
+        self.level_box.currentIndexChanged.connect(self.query_changed.emit)
+        self.view_box = QComboBox()
+        self.view_box.setProperty("role", "size")
+        self.view_box.addItems(self.VIEWS)
+        self.view_box.currentIndexChanged.connect(self.query_changed.emit)
+        self.replay_btn = QPushButton("Повтор")
+        self.replay_btn.setProperty("role", "tool")
+        self.replay_btn.setEnabled(False)
+        self.replay_btn.clicked.connect(self.request_replay)
+        level_row.addWidget(level_label)
+        level_row.addWidget(self.level_box)
+        level_row.addWidget(self.view_box)
+        level_row.addStretch()
+        level_row.addWidget(self.replay_btn)
+        layout.addLayout(level_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setMinimumHeight(200)
+        self.table.itemSelectionChanged.connect(self.update_replay_button)
+        self.table.cellDoubleClicked.connect(self.request_replay)
+        layout.addWidget(self.table)
+
+    def level(self):
+        return self.level_box.currentData()
+
+    def showing_history(self):
+        return self.view_box.currentText() == "Последние"
+
+    def selected_game(self):
+        """id выбранной игры, если у нее есть запись ходов, иначе None"""
+        items = self.table.selectedItems()
+        return items[0].data(Qt.ItemDataRole.UserRole) if items else None
+
+    def update_replay_button(self):
+        self.replay_btn.setEnabled(self.selected_game() is not None)
+
+    def request_replay(self):
+        game_id = self.selected_game()
+        if game_id is not None:
+            self.replay_requested.emit(game_id)
+
+    def add_levels(self, levels):
+        """Добавляет в level_box размеры полей, по которым появились игры"""
+        for level in sorted(set(levels) - set(self.levels)):
+            self.levels.append(level)
+            self.levels.sort()
+            self.level_box.blockSignals(True)
+            self.level_box.insertItem(self.levels.index(level), f"{level}x{level}", level)
+            self.level_box.blockSignals(False)
+
+    def update_board(self, rows):
+        """Заполняет таблицу строками (id, moves, time, seed, optimal, finished_at, has_log)"""
+        self.table.clearSelection()
+        self.table.setRowCount(len(rows))
+        for row, (game_id, moves, elapsed_time, seed, optimal, finished_at, has_log) in enumerate(rows):
+            cells = [str(moves), self.format_time(elapsed_time),
+                     "—" if optimal is None else str(optimal),
+                     time.strftime("%d.%m.%Y", time.localtime(finished_at))]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                # Без записи ходов (например, игра из best_results.json) повтора нет
+                item.setData(Qt.ItemDataRole.UserRole, game_id if has_log else None)
+                self.table.setItem(row, column, item)
+        self.update_replay_button()
+
+    def format_time(self, seconds):
+        minutes = int(seconds // 60)
+        seconds = seconds % 60
+        return f"{minutes}:{seconds:05.2f}"
@@ -1,15 +1,24 @@
 import os
-import json
 from PyQt6.QtWidgets import (QVBoxLayout, QPushButton, QLabel, QWidget,
-                             QSizePolicy, QHBoxLayout)
+                             QSizePolicy, QHBoxLayout, QSpinBox, QComboBox)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from Background import BackgroundWidget
+from DistanceTable import TABLE_PATH
+from ResultsStore import results_store
+from LeaderboardPanel import LeaderboardPanel
+from StatsPanel import StatsPanel
 
 
 class LevelScreen(BackgroundWidget):
     """Экран выбора уровня с лучшими результатами"""
 
+    # Поле произвольного размера выбирается в size_box
+    MIN_CUSTOM_SIZE = 6
+    MAX_CUSTOM_SIZE = 20
+    # Длина оптимального решения для 3x3 (точные длины есть только там)
+    DIFFICULTIES = {"Случайно": None, "Легко": 10, "Средне": 18, "Сложно": 26}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_ui()
@@ -21,15 +30,7 @@ class LevelScreen(BackgroundWidget):
         title = QLabel("Выберите уровень сложности")
         title.setFont(QFont("Arial", 20))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            QLabel {
-                background: rgba(255, 255, 255, 0.8);
-                border-radius: 10px;
-                padding: 15px;
-                margin-bottom: 30px;
-                font-weight: bold;
-            }
-        """)
+        title.setProperty("role", "screen-title")
 
         # Загружаем лучшие результаты
         best_results = self.load_best_results()
@@ -39,31 +40,13 @@ class LevelScreen(BackgroundWidget):
         self.level4_btn = QPushButton(self.get_level_text(4, best_results))
         self.level5_btn = QPushButton(self.get_level_text(5, best_results))
 
-        for btn in [self.level3_btn, self.level4_btn, self.level5_btn]:
+        self.custom_btn = QPushButton(self.get_level_text(self.MIN_CUSTOM_SIZE, best_results))
+
+        for btn in [self.level3_btn, self.level4_btn, self.level5_btn, self.custom_btn]:
             btn.setFont(QFont("Arial", 14))
             btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
             btn.setMinimumHeight(80)
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: rgba(255, 255, 255, 0.3);
-                    border: 2px solid rgba(255, 255, 255, 0.5);
-                    border-radius: 15px;
-                    padding: 20px;
-                    color: black;
-                    font-weight: bold;
-                    margin: 5px 50px;
-                }
-                QPushButton:hover {
-                    background-color: rgba(0, 0, 0, 0.3);
-                    border: 2px solid rgba(255, 255, 255, 0.8);
-                    color: #FFD700;
-                }
-                QPushButton:pressed {
-                    background-color: rgba(0, 0, 0, 0.5);
-                    border: 2px solid #FFD700;
-                    color: #FFD700;
-                }
-            """)
+            btn.setProperty("role", "level")
 
         # Контейнер для кнопок с ограничением максимальной ширины
         buttons_container = QWidget()
@@ -72,9 +55,65 @@ class LevelScreen(BackgroundWidget):
         buttons_layout.setSpacing(15)
 
         buttons_layout.addWidget(self.level3_btn)
+
+        difficulty_label = QLabel("Сложность 3x3:")
+        difficulty_label.setFont(QFont("Arial", 12))
+        difficulty_label.setProperty("role", "badge")
+        self.difficulty_box = QComboBox()
+        self.difficulty_box.setFont(QFont("Arial", 12))
+        self.difficulty_box.addItems(list(self.DIFFICULTIES))
+        self.difficulty_box.setProperty("role", "size")
+        self.update_difficulty_box()
+        difficulty_layout = QHBoxLayout()
+        difficulty_layout.addStretch()
+        difficulty_layout.addWidget(difficulty_label)
+        difficulty_layout.addWidget(self.difficulty_box)
+        difficulty_layout.addStretch()
+        buttons_layout.addLayout(difficulty_layout)
+
         buttons_layout.addWidget(self.level4_btn)
         buttons_layout.addWidget(self.level5_btn)
 
+        size_label = QLabel("Другой размер поля:")
+        size_label.setFont(QFont("Arial", 12))
+        size_label.setProperty("role", "badge")
+        self.size_box = QSpinBox()
+        self.size_box.setFont(QFont("Arial", 12))
+        self.size_box.setRange(self.MIN_CUSTOM_SIZE, self.MAX_CUSTOM_SIZE)
+        self.size_box.setProperty("role", "size")
+        self.size_box.valueChanged.connect(self.update_custom_level)
+        size_layout = QHBoxLayout()
+        size_layout.addStretch()
+        size_layout.addWidget(size_label)
+        size_layout.addWidget(self.size_box)
+        size_layout.addStretch()
+        buttons_layout.addLayout(size_layout)
+        buttons_layout.addWidget(self.custom_btn)
+
+        # Статистика по уровням, скрыта до нажатия кнопки
+        self.stats_btn = QPushButton("Статистика")
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.setProperty("role", "toggle")
+        self.stats_btn.toggled.connect(self.toggle_stats)
+        buttons_layout.addWidget(self.stats_btn)
+
+        self.stats_panel = StatsPanel([3, 4, 5])
+        self.stats_panel.rebuild_requested.connect(self.rebuild_stats)
+        self.stats_panel.hide()
+        buttons_layout.addWidget(self.stats_panel)
+
+        # Рекорды и последние игры выбранного уровня, тоже по кнопке
+        self.leaderboard_btn = QPushButton("Рекорды и история")
+        self.leaderboard_btn.setCheckable(True)
+        self.leaderboard_btn.setProperty("role", "toggle")
+        self.leaderboard_btn.toggled.connect(self.toggle_leaderboard)
+        buttons_layout.addWidget(self.leaderboard_btn)
+
+        self.leaderboard_panel = LeaderboardPanel([3, 4, 5])
+        self.leaderboard_panel.query_changed.connect(self.update_leaderboard)
+        self.leaderboard_panel.hide()
+        buttons_layout.addWidget(self.leaderboard_panel)
+
         # Основной layout
         layout.addStretch()
         layout.addWidget(title)
@@ -90,38 +129,9 @@ class LevelScreen(BackgroundWidget):
             5: self.level5_btn
         }
 
-        # Создаём Overlay для загрузки
-        self.create_loading_overlay()
-
-    def create_loading_overlay(self):
-        """Создает overlay для загрузки с абсолютным позиционированием"""
-        # Overlay затемняет весь экран
-        self.loading_overlay = QWidget(self)
-        self.loading_overlay.setStyleSheet("background: rgba(0, 0, 0, 0.7);")
-        self.loading_overlay.hide()
-
-        # Текст загрузки БЕЗ фона
-        self.loading_label = QLabel("Загрузка...", self.loading_overlay)
-        self.loading_label.setFont(QFont("Arial", 24, QFont.Weight.Bold))
-        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.loading_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                background: transparent;
-                padding: 20px;
-            }
-        """)
-        self.loading_label.setMinimumSize(400, 100)
-
     def load_best_results(self):
-        """Загружает лучшие результаты из файла"""
-        try:
-            if os.path.exists('best_results.json'):
-                with open('best_results.json', 'r') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+        """Лучшие результаты из истории игр (кэшируются в памяти)"""
+        return results_store.best_results()
 
     def get_level_text(self, level, best_results):
         """Формирует текст для кнопки уровня"""
@@ -133,6 +143,23 @@ class LevelScreen(BackgroundWidget):
         else:
             return f"{level}x{level}\nЛучший: ---"
 
+    def custom_size(self):
+        return self.size_box.value()
+
+    def difficulty(self):
+        """Выбранная длина оптимального решения для 3x3 или None"""
+        return self.DIFFICULTIES[self.difficulty_box.currentText()]
+
+    def update_difficulty_box(self):
+        # Без таблицы расстояний длины не узнать; ее строят явно
+        available = os.path.exists(TABLE_PATH)
+        self.difficulty_box.setEnabled(available)
+        self.difficulty_box.setToolTip("Сколько ходов займет оптимальное решение" if available else
+                                       "Нужна таблица расстояний: python DistanceTable.py (несколько секунд)")
+
+    def update_custom_level(self):
+        self.custom_btn.setText(self.get_level_text(self.custom_size(), self.load_best_results()))
+
     def format_time(self, seconds):
         """Форматирование времени"""
         minutes = int(seconds // 60)
@@ -146,38 +173,30 @@ class LevelScreen(BackgroundWidget):
         self.level3_btn.setText(self.get_level_text(3, best_results))
         self.level4_btn.setText(self.get_level_text(4, best_results))
         self.level5_btn.setText(self.get_level_text(5, best_results))
-
-    def show_loading(self, level):
-        """Показывает индикатор загрузки"""
-        # Отключаем все кнопки
-        for btn in self.buttons.values():
-            btn.setEnabled(False)
-
-        # Устанавливаем текст
-        self.loading_label.setText(f"Загрузка уровня\n{level}x{level}...")
-
-        # Показываем overlay на весь экран
-        self.loading_overlay.resize(self.size())
-        self.loading_overlay.show()
-
-        # Центрируем текст
-        self.loading_label.move(
-            (self.width() - self.loading_label.width()) // 2,
-            (self.height() - self.loading_label.height()) // 2
-        )
-
-    def hide_loading(self):
-        """Скрывает индикатор загрузки и включает кнопки"""
-        self.loading_overlay.hide()
-        for btn in self.buttons.values():
-            btn.setEnabled(True)
-
-    def resizeEvent(self, event):
-        """При изменении размера окна обновляем позиции"""
-        super().resizeEvent(event)
-        if self.loading_overlay.isVisible():
-            self.loading_overlay.resize(self.size())
-            self.loading_label.move(
-                (self.width() - self.loading_label.width()) // 2,
-                (self.height() - self.loading_label.height()) // 2
-            )
\ No newline at end of file
+        self.custom_btn.setText(self.get_level_text(self.custom_size(), best_results))
+        self.update_difficulty_box()
+        if self.stats_panel.isVisible():
+            self.stats_panel.update_stats(results_store.level_stats())
+        if self.leaderboard_panel.isVisible():
+            self.update_leaderboard()
+
+    def toggle_stats(self, shown):
+        if shown:
+            self.stats_panel.update_stats(results_store.level_stats())
+        self.stats_panel.setVisible(shown)
+
+    def toggle_leaderboard(self, shown):
+        if shown:
+            self.update_leaderboard()
+        self.leaderboard_panel.setVisible(shown)
+
+    def update_leaderboard(self):
+        """Рекорды или последние игры уровня, выбранного в панели"""
+        panel = self.leaderboard_panel
+        panel.add_levels(int(level) for level in self.load_best_results())
+        query = results_store.history if panel.showing_history() else results_store.leaderboard
+        panel.update_board(query(panel.level(), panel.LIMIT))
+
+    def rebuild_stats(self):
+        """Полный пересчет статистики по истории игр"""
+        self.stats_panel.update_stats(results_store.rebuild_stats())
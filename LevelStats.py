@@ -0,0 +1,137 @@
+"""Потоковая статистика уровня: квантили, гистограмма ходов, тренд
+
+Каждая игра добавляется за O(1), а размер состояния не зависит от числа
+игр в истории, поэтому экран выбора уровня открывается одинаково быстро
+и при десятках тысяч записей. Полный пересчет по истории - только в
+ResultsStore.rebuild_stats().
+"""
+import math
+from collections import deque
+
+
+class QuantileSketch:
+    """Квантильный скетч с относительной погрешностью (как DDSketch)
+
+    Значения раскладываются по логарифмическим корзинам ширины gamma, число
+    корзин растет только с логарифмом диапазона значений. Любой квантиль
+    оценивается с относительной ошибкой не больше accuracy.
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = {}          # номер корзины -> количество
+        self.zero_count = 0     # значения <= 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def bin_value(self, key):
+        """Представитель корзины: середина по относительной ошибке"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return self.bin_value(key)
+        return self.bin_value(max(self.bins))
+
+    def buckets(self):
+        """Пары (значение, количество) по возрастанию"""
+        result = [(0.0, self.zero_count)] if self.zero_count else []
+        result.extend((self.bin_value(key), self.bins[key]) for key in sorted(self.bins))
+        return result
+
+    def to_dict(self):
+        return {'accuracy': self.accuracy, 'zero': self.zero_count,
+                'bins': {str(key): count for key, count in self.bins.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['accuracy'])
+        sketch.zero_count = data['zero']
+        sketch.bins = {int(key): count for key, count in data['bins'].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+class LevelStats:
+    """Статистика одного уровня: скетчи ходов и времени и последние игры для тренда"""
+
+    TREND_WINDOW = 20
+
+    def __init__(self):
+        self.count = 0
+        self.moves = QuantileSketch()
+        self.time = QuantileSketch()
+        # Два окна по TREND_WINDOW игр: текущее и предыдущее
+        self.recent = deque(maxlen=2 * self.TREND_WINDOW)
+
+    def add(self, moves, elapsed_time):
+        self.count += 1
+        self.moves.add(moves)
+        self.time.add(elapsed_time)
+        self.recent.append((moves, elapsed_time))
+
+    def summary(self):
+        """Медиана и p90 по ходам и времени"""
+        return {
+            'moves_median': self.moves.quantile(0.5),
+            'moves_p90': self.moves.quantile(0.9),
+            'time_median': self.time.quantile(0.5),
+            'time_p90': self.time.quantile(0.9),
+        }
+
+    def histogram(self, bars=12):
+        """Гистограмма ходов: (левая граница, ширина, счетчики) между p1 и p99"""
+        if self.count == 0:
+            return None
+        low = self.moves.quantile(0.01)
+        high = self.moves.quantile(0.99)
+        width = max((high - low) / bars, 1.0)
+        counts = [0] * bars
+        for value, count in self.moves.buckets():
+            index = int((value - low) / width)
+            counts[min(max(index, 0), bars - 1)] += count
+        return low, width, counts
+
+    def trend(self):
+        """Средние ходы и время последнего окна и предыдущего (None, пока игр мало)"""
+        if len(self.recent) <= self.TREND_WINDOW:
+            return None
+        games = list(self.recent)
+        previous = games[:-self.TREND_WINDOW]
+        current = games[-self.TREND_WINDOW:]
+
+        def means(window):
+            return (sum(moves for moves, _ in window) / len(window),
+                    sum(elapsed for _, elapsed in window) / len(window))
+
+        return means(current), means(previous)
+
+    def to_dict(self):
+        return {'count': self.count, 'moves': self.moves.to_dict(),
+                'time': self.time.to_dict(), 'recent': list(self.recent)}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data['count']
+        stats.moves = QuantileSketch.from_dict(data['moves'])
+        stats.time = QuantileSketch.from_dict(data['time'])
+        stats.recent.extend(tuple(game) for game in data['recent'])
+        return stats
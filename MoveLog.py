@@ -0,0 +1,153 @@
+"""Компактная запись партии: начальная расстановка, зерно и 2 бита на ход
+
+Формат (little-endian):
+    заголовок  "<4sBBqI": b"15MV", версия, размер поля, зерно (-1 - нет), число ходов
+    расстановка: size*size номеров фишек по 1 байту (по 2 байта, если клеток больше 256)
+    ходы: направления пустой клетки (UP/DOWN/LEFT/RIGHT), по 4 в байте, младшие биты первыми
+
+Ходы идут строго по порядку, поэтому запись можно читать и проигрывать
+потоком. Отмена и повтор хода - это сдвиг курсора по записи, снимки поля
+не нужны: отмененный ход восстанавливается обратным направлением.
+"""
+import struct
+from array import array
+
+from Board import Board, OPPOSITE
+
+MAGIC = b"15MV"
+VERSION = 1
+HEADER = struct.Struct("<4sBBqI")
+
+# Байт -> четыре направления, чтобы не распаковывать биты по одному
+DECODE = [tuple((byte >> shift) & 3 for shift in (0, 2, 4, 6)) for byte in range(256)]
+
+
+class MoveLog:
+    """Запись ходов одной партии с курсором для отмены и повтора
+
+    Ходы [0, cursor) сделаны, ходы [cursor, length) отменены и доступны для
+    redo(). Новый ход после отмены отбрасывает отмененный хвост.
+    """
+
+    def __init__(self, size, tiles, seed=None):
+        self.size = size
+        self.tiles = list(tiles)
+        self.seed = seed
+        self.data = bytearray()
+        self.length = 0
+        self.cursor = 0
+
+    def __len__(self):
+        return self.cursor
+
+    def direction(self, index):
+        return (self.data[index >> 2] >> ((index & 3) * 2)) & 3
+
+    def write(self, index, direction):
+        byte, shift = index >> 2, (index & 3) * 2
+        if byte == len(self.data):
+            self.data.append(0)
+        self.data[byte] = (self.data[byte] & ~(3 << shift)) | (direction << shift)
+
+    def append(self, direction):
+        """Записывает ход пустой клетки; отмененные ходы после курсора теряются"""
+        self.write(self.cursor, direction)
+        self.cursor += 1
+        self.length = self.cursor
+
+    def can_undo(self):
+        return self.cursor > 0
+
+    def can_redo(self):
+        return self.cursor < self.length
+
+    def undo(self):
+        """Направление, которым нужно сдвинуть пустую клетку, чтобы отменить ход (-1 - нечего)"""
+        if not self.cursor:
+            return -1
+        self.cursor -= 1
+        return OPPOSITE[self.direction(self.cursor)]
+
+    def redo(self):
+        """Направление повторяемого хода (-1 - нечего)"""
+        if self.cursor >= self.length:
+            return -1
+        self.cursor += 1
+        return self.direction(self.cursor - 1)
+
+    def directions(self, start=0, stop=None):
+        """Сделанные ходы по порядку (по байту за раз)"""
+        stop = self.cursor if stop is None else stop
+        index = start
+        while index < stop:
+            first = index & 3
+            for direction in DECODE[self.data[index >> 2]][first:min(4, first + stop - index)]:
+                yield direction
+            index += 4 - first
+
+    def initial_board(self):
+        return Board(self.size, self.tiles)
+
+    def replay(self):
+        """Проигрывает запись и проверяет каждый ход; возвращает итоговое поле
+
+        Ходы применяются к простому списку по таблице соседей, а не через
+        Board.move_blank: проверка записи в 10 000 ходов занимает миллисекунды.
+        """
+        size = self.size
+        neighbors = []
+        for index in range(size * size):
+            row, col = divmod(index, size)
+            neighbors.append((index - size if row > 0 else -1,
+                              index + size if row < size - 1 else -1,
+                              index - 1 if col > 0 else -1,
+                              index + 1 if col < size - 1 else -1))
+        cells = list(self.tiles)
+        empty = cells.index(0)
+        number = 0
+        for byte in self.data[:(self.cursor + 3) // 4]:
+            for direction in DECODE[byte]:
+                if number == self.cursor:
+                    break
+                target = neighbors[empty][direction]
+                if target < 0:
+                    raise ValueError(f"Недопустимый ход {number + 1} в записи партии")
+                cells[empty] = cells[target]
+                empty = target
+                number += 1
+        cells[empty] = 0
+        return Board(size, cells)
+
+    def to_bytes(self):
+        """Сериализация сделанных ходов (отмененный хвост не сохраняется)"""
+        used = (self.cursor + 3) // 4
+        moves = bytearray(self.data[:used])
+        if self.cursor & 3:
+            # Обнуляем биты за последним ходом
+            moves[-1] &= (1 << ((self.cursor & 3) * 2)) - 1
+        typecode = 'B' if self.size * self.size <= 256 else 'H'
+        seed = -1 if self.seed is None else self.seed
+        return (HEADER.pack(MAGIC, VERSION, self.size, seed, self.cursor)
+                + array(typecode, self.tiles).tobytes() + bytes(moves))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Разбор записи; ValueError, если данные повреждены"""
+        if len(data) < HEADER.size:
+            raise ValueError("Запись партии обрезана")
+        magic, version, size, seed, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Неизвестный формат записи партии")
+        typecode = 'B' if size * size <= 256 else 'H'
+        tiles = array(typecode)
+        tiles_end = HEADER.size + size * size * tiles.itemsize
+        moves_end = tiles_end + (count + 3) // 4
+        if len(data) < moves_end:
+            raise ValueError("Запись партии обрезана")
+        tiles.frombytes(bytes(data[HEADER.size:tiles_end]))
+        if sorted(tiles) != list(range(size * size)):
+            raise ValueError("В записи партии неверная расстановка")
+        log = cls(size, tiles, None if seed < 0 else seed)
+        log.data = bytearray(data[tiles_end:moves_end])
+        log.length = log.cursor = count
+        return log
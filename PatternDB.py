@@ -0,0 +1,369 @@
+"""Аддитивные непересекающиеся базы шаблонов (pattern databases)
+
+Сборка (офлайн, один раз; нужен numpy, самой игре он не нужен):
+    python PatternDB.py --size 3                   # 4-4: доли секунды
+    python PatternDB.py --size 4                   # 6-6-3: ~50 с, пик ~110 МБ, 12 МБ на диске
+    python PatternDB.py --size 4 --partition 7-8   # ~50 мин, пик ~1,6 ГБ, 577 МБ на диске
+    python PatternDB.py --size 5                   # 6-6-6-6: ~12 мин на группу, пик ~650 МБ, 510 МБ на диске
+
+Каждая группа фишек хранится отдельным файлом pdb/<size>x<size>_<фишки>.pdb:
+заголовок и по одному байту на каждую частичную перестановку позиций группы.
+Во время игры таблицы открываются через mmap только при первом обращении,
+поэтому запуск не тратит время на чтение сотен мегабайт, а несколько
+процессов делят одни и те же страницы.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+PDB_DIR = "pdb"
+MAGIC = b"PDB1"
+HEADER = struct.Struct("<4sBB26s")
+UNKNOWN = 255
+# Состояний в одной порции обхода (память порции - около 100 байт на состояние)
+CHUNK = 1 << 17
+
+# Разбиения фишек на группы для цели "1..N-1, пустая клетка в правом нижнем углу"
+PARTITIONS = {
+    3: {
+        "4-4": ((1, 2, 3, 4), (5, 6, 7, 8)),
+    },
+    4: {
+        "6-6-3": ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)),
+        "7-8": ((1, 2, 3, 4, 5, 6, 7, 8), (9, 10, 11, 12, 13, 14, 15)),
+    },
+    5: {
+        "6-6-6-6": ((1, 2, 3, 6, 7, 8), (4, 5, 9, 10, 14, 15),
+                    (11, 12, 16, 17, 21, 22), (13, 18, 19, 20, 23, 24)),
+    },
+}
+DEFAULT_PARTITION = {3: "4-4", 4: "6-6-3", 5: "6-6-6-6"}
+
+
+def table_size(cells, k):
+    """Количество частичных перестановок k позиций из cells"""
+    result = 1
+    for i in range(k):
+        result *= cells - i
+    return result
+
+
+def rank(positions, cells):
+    """Номер частичной перестановки (позиции фишек группы по порядку)"""
+    result = 0
+    k = len(positions)
+    for i in range(k):
+        value = positions[i]
+        smaller = 0
+        for j in range(i):
+            if positions[j] < value:
+                smaller += 1
+        result = result * (cells - i) + value - smaller
+    return result
+
+
+def table_path(size, tiles, directory=PDB_DIR):
+    return os.path.join(directory, f"{size}x{size}_{'-'.join(map(str, tiles))}.pdb")
+
+
+def build_table(size, tiles, progress=None, work_dir=None):
+    """Строит таблицу для одной группы 0-1 обходом в ширину
+
+    Состояние - позиции фишек группы и область, в которой может свободно ходить
+    пустая клетка (ходы по чужим фишкам бесплатны). Область задается
+    наименьшим индексом клетки в ней. Стоимость имеют только ходы фишками
+    группы, поэтому таблицы разных групп можно складывать.
+
+    Обход идет слоями по глубине, каждый слой - массивами numpy порциями по
+    CHUNK состояний: позиции фишек (k байт) и область как битовая маска
+    клеток. Ранги, области и отметки посещенных считаются сразу для всей
+    порции. Слои пишутся во временные файлы в work_dir, в памяти остаются
+    таблица (байт на ранг) и битовые отметки посещенных (ранг * клетки бит).
+    """
+    import numpy as np
+
+    cells = size * size
+    k = len(tiles)
+    full = np.uint32((1 << cells) - 1)
+    count = table_size(cells, k)
+    table = np.full(count, UNKNOWN, dtype=np.uint8)
+    visited = np.zeros((count * cells + 7) // 8, dtype=np.uint8)
+
+    # bits[cells] = 0: ход за край поля никуда не ведет
+    bits = np.array([1 << cell for cell in range(cells)] + [0], dtype=np.uint32)
+    neighbors = np.full((4, cells), cells, dtype=np.intp)
+    for index in range(cells):
+        i, j = divmod(index, size)
+        for direction, (ni, nj) in enumerate(((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))):
+            if 0 <= ni < size and 0 <= nj < size:
+                neighbors[direction, index] = ni * size + nj
+    first_column = sum(1 << (i * size) for i in range(size))
+    not_first = np.uint32(((1 << cells) - 1) & ~first_column)
+    not_last = np.uint32(((1 << cells) - 1) & ~(first_column << (size - 1)))
+
+    def spread(region, free):
+        """Заливка: клетки free, до которых пустая клетка доходит из region"""
+        active = np.arange(len(region))
+        while len(active):
+            current = region[active]
+            grown = (current | (current >> size) | (current << size)
+                     | ((current & not_first) >> 1) | ((current & not_last) << 1)) & free[active]
+            changed = grown != current
+            region[active] = grown
+            active = active[changed]
+        return region
+
+    def ranks(positions):
+        """rank() для каждой строки positions"""
+        result = np.zeros(len(positions), dtype=np.int64)
+        for i in range(k):
+            value = positions[:, i].astype(np.int64)
+            for j in range(i):
+                value -= positions[:, j] < positions[:, i]
+            result = result * (cells - i) + value
+        return result
+
+    def codes(positions, regions):
+        lowest = regions & (~regions + np.uint32(1))
+        return ranks(positions) * cells + np.log2(lowest).astype(np.int64)
+
+    depth = 0
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="pdb_", dir=work_dir) as scratch:
+        def layer_files(number):
+            base = os.path.join(scratch, str(number))
+            return base + ".pos", base + ".reg"
+
+        def visit(positions, regions, files):
+            """Отмечает новые состояния порции, дописывает их в слой; возвращает их число"""
+            code = codes(positions, regions)
+            code, first = np.unique(code, return_index=True)
+            fresh = (visited[code >> 3] >> (code & 7).astype(np.uint8)) & 1 == 0
+            code, first = code[fresh], first[fresh]
+            np.bitwise_or.at(visited, code >> 3, np.left_shift(1, code & 7).astype(np.uint8))
+            state_ranks = code // cells
+            table[state_ranks[table[state_ranks] == UNKNOWN]] = depth
+            positions[first].tofile(files[0])
+            regions[first].tofile(files[1])
+            return len(first)
+
+        goal = np.array([[tile - 1 for tile in tiles]], dtype=np.uint8)
+        free = np.array([full & ~np.bitwise_or.reduce(bits[goal[0]])], dtype=np.uint32)
+        with open(layer_files(0)[0], "wb") as pos_file, open(layer_files(0)[1], "wb") as reg_file:
+            size_of_layer = visit(goal, spread(bits[[cells - 1]], free), (pos_file, reg_file))
+
+        while size_of_layer:
+            depth += 1
+            size_of_layer = 0
+            source = layer_files(depth - 1)
+            target = layer_files(depth)
+            with open(source[0], "rb") as pos_in, open(source[1], "rb") as reg_in, \
+                    open(target[0], "wb") as pos_out, open(target[1], "wb") as reg_out:
+                while True:
+                    positions = np.fromfile(pos_in, dtype=np.uint8, count=CHUNK * k).reshape(-1, k)
+                    if not len(positions):
+                        break
+                    regions = np.fromfile(reg_in, dtype=np.uint32, count=len(positions))
+                    occupied = np.bitwise_or.reduce(bits[positions], axis=1)
+                    moved_positions = []
+                    moved_regions = []
+                    for slot in range(k):
+                        src = positions[:, slot]
+                        for direction in range(4):
+                            dst = neighbors[direction][src]
+                            # Фишка группы переходит в соседнюю пустую клетку из области
+                            rows = np.flatnonzero(regions & bits[dst])
+                            if not len(rows):
+                                continue
+                            moved = positions[rows]
+                            moved[:, slot] = dst[rows]
+                            vacated = bits[src[rows]]
+                            free = full & ~(occupied[rows] ^ vacated ^ bits[dst[rows]])
+                            moved_positions.append(moved)
+                            moved_regions.append(spread(vacated, free))
+                    if moved_positions:
+                        size_of_layer += visit(np.concatenate(moved_positions),
+                                               np.concatenate(moved_regions), (pos_out, reg_out))
+            os.remove(source[0])
+            os.remove(source[1])
+            if progress:
+                progress(depth, size_of_layer, time.perf_counter() - started)
+    return table
+
+
+def write_table(path, size, tiles, table):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, len(tiles), bytes(tiles)))
+        f.write(table)
+    os.replace(tmp_path, path)
+
+
+class PatternTable:
+    """Одна таблица группы, отображенная в память при первом обращении"""
+
+    def __init__(self, path, size, tiles):
+        self.path = path
+        self.size = size
+        self.tiles = tuple(tiles)
+        self.data = None
+
+    def open(self):
+        if self.data is None:
+            with open(self.path, "rb") as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, size, k, tiles = HEADER.unpack_from(self.data, 0)
+            if magic != MAGIC or size != self.size or tuple(tiles[:k]) != self.tiles:
+                self.data.close()
+                self.data = None
+                raise ValueError(f"Файл {self.path} не соответствует группе {self.tiles}")
+        return self.data
+
+    def close(self):
+        if self.data is not None and self.path is not None:
+            self.data.close()
+            self.data = None
+
+
+class PatternDatabase:
+    """Эвристика для Solver: сумма значений по группам
+
+    Интерфейс совпадает с ManhattanLinearConflict (reset/move). При ходе
+    пересчитывается только ранг группы, к которой относится сдвинутая фишка.
+    """
+
+    # (размер, группа) -> таблица с заголовком, собранная build() в памяти
+    _built = {}
+
+    def __init__(self, size, groups, directory=PDB_DIR, partition=None):
+        self.size = size
+        self.cells = size * size
+        self.groups = tuple(tuple(group) for group in groups)
+        self.name = f"pdb {partition or '-'.join(str(len(group)) for group in self.groups)}"
+        self.tables = [PatternTable(table_path(size, group, directory), size, group)
+                       for group in self.groups]
+        self.views = None
+        # group_of[tile] - номер группы, slot_of[tile] - место фишки в группе
+        self.group_of = [-1] * self.cells
+        self.slot_of = [-1] * self.cells
+        for number, group in enumerate(self.groups):
+            for slot, tile in enumerate(group):
+                self.group_of[tile] = number
+                self.slot_of[tile] = slot
+        self.positions = [[0] * len(group) for group in self.groups]
+        self.values = [0] * len(self.groups)
+        self.total = 0
+
+    @classmethod
+    def find(cls, size, partition=None, directory=PDB_DIR):
+        """Возвращает базу, если все ее файлы уже построены, иначе None"""
+        partition = partition or DEFAULT_PARTITION.get(size)
+        groups = PARTITIONS.get(size, {}).get(partition)
+        if groups is None:
+            return None
+        if not all(os.path.exists(table_path(size, group, directory)) for group in groups):
+            return None
+        return cls(size, groups, directory, partition)
+
+    @classmethod
+    def build(cls, size, partition=None):
+        """База, собранная в памяти без файлов; None, если сборка недоступна (нет numpy)
+
+        Только для маленьких разбиений: 4-4 для 3x3 собирается за доли
+        секунды. Таблицы собираются один раз на процесс, а каждый вызов
+        возвращает свою базу - поиски в разных потоках не делят позиции групп.
+        """
+        partition = partition or DEFAULT_PARTITION.get(size)
+        groups = PARTITIONS.get(size, {}).get(partition)
+        if groups is None:
+            return None
+        try:
+            for group in groups:
+                if (size, group) not in cls._built:
+                    cls._built[size, group] = HEADER.pack(MAGIC, size, len(group), bytes(group)) + \
+                        build_table(size, group).tobytes()
+        except ImportError:
+            return None
+        database = cls(size, groups, partition=partition)
+        for table in database.tables:
+            table.path = None
+            table.data = cls._built[size, table.tiles]
+        return database
+
+    def open(self):
+        """Отображает таблицы в память (лениво, при первом поиске)"""
+        if self.views is None:
+            self.views = [table.open() for table in self.tables]
+        return self.views
+
+    def close(self):
+        for table in self.tables:
+            table.close()
+        self.views = None
+
+    def lookup(self, number):
+        return self.views[number][HEADER.size + rank(self.positions[number], self.cells)]
+
+    def reset(self, cells):
+        self.open()
+        for index, tile in enumerate(cells):
+            if tile and self.group_of[tile] >= 0:
+                self.positions[self.group_of[tile]][self.slot_of[tile]] = index
+        for number in range(len(self.groups)):
+            self.values[number] = self.lookup(number)
+        self.total = sum(self.values)
+        return self.total
+
+    def move(self, cells, tile, src, dst):
+        number = self.group_of[tile]
+        if number < 0:
+            return self.total
+        self.positions[number][self.slot_of[tile]] = dst
+        value = self.lookup(number)
+        self.total += value - self.values[number]
+        self.values[number] = value
+        return self.total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сборка аддитивных баз шаблонов")
+    parser.add_argument("--size", type=int, default=4, choices=sorted(PARTITIONS))
+    parser.add_argument("--partition", default=None,
+                        help="разбиение фишек, например 6-6-3 или 7-8")
+    parser.add_argument("--output", default=PDB_DIR, help="каталог для таблиц")
+    args = parser.parse_args(argv)
+    # numpy нужен только сборке: игра читает готовые таблицы без него
+    try:
+        import numpy
+    except ImportError:
+        parser.error("для сборки таблиц нужен numpy (pip install numpy)")
+
+    partition = args.partition or DEFAULT_PARTITION[args.size]
+    groups = PARTITIONS[args.size].get(partition)
+    if groups is None:
+        parser.error(f"Неизвестное разбиение {partition}, доступны: "
+                     f"{', '.join(PARTITIONS[args.size])}")
+
+    for group in groups:
+        path = table_path(args.size, group, args.output)
+        if os.path.exists(path):
+            print(f"{path}: уже построена")
+            continue
+        print(f"{path}: {table_size(args.size * args.size, len(group))} записей")
+
+        def progress(depth, frontier, elapsed):
+            print(f"  глубина {depth}: {frontier} состояний, {elapsed:.1f} с", flush=True)
+
+        os.makedirs(args.output, exist_ok=True)
+        table = build_table(args.size, group, progress, work_dir=args.output)
+        write_table(path, args.size, group, table)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
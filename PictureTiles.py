@@ -0,0 +1,239 @@
+"""Головоломка из своей картинки: нарезка на N×N фишек с кэшем на диске
+
+Картинка обрезается до квадрата по центру и один раз масштабируется до
+N·pixels на сторону; фишки - это QImage-окна в этом общем буфере (без
+копии на каждую фишку). Результат пишется в PUZZLE_CACHE_DIR в файл
+    <хеш картинки>_<N>x<N>_<pixels>.tiles
+(заголовок TILES_HEADER, затем с границы DATA_ALIGN строки ARGB32
+premultiplied) и при повторном открытии той же картинки на том же уровне
+просто отображается через mmap. Нарезка идет в пуле потоков; пока она не
+готова, поле рисует процедурные лица фишек.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QObject, QRect, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from AssetPack import DATA_ALIGN, PACK_FORMAT, mapped_image
+from Tracing import tracer
+
+PUZZLE_CACHE_DIR = "puzzle_cache"
+MAX_CACHED_PUZZLES = 64
+
+TILES_MAGIC = b"15PZ"
+TILES_VERSION = 1
+# магия, версия, размер поля, пикселей на фишку, байт в строке
+TILES_HEADER = struct.Struct("<4sHHII")
+BYTES_PER_PIXEL = 4             # PACK_FORMAT (ARGB32 premultiplied)
+
+# (путь, размер, mtime_ns) -> хеш: уже посчитанные хеши картинок
+digests = {}
+
+
+def file_key(path):
+    stat = os.stat(path)
+    return path, stat.st_size, stat.st_mtime_ns
+
+
+def picture_digest(path):
+    """Хеш содержимого картинки (ключ кэша не зависит от имени файла)"""
+    key = file_key(path)
+    if key not in digests:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digests[key] = digest.hexdigest()
+    return digests[key]
+
+
+def known_digest(path):
+    """Хеш картинки, если он уже считался (без чтения файла), иначе None"""
+    try:
+        return digests.get(file_key(path))
+    except OSError:
+        return None
+
+
+def cache_path(digest, size, pixels, cache_dir=PUZZLE_CACHE_DIR):
+    return os.path.join(cache_dir, f"{digest}_{size}x{size}_{pixels}.tiles")
+
+
+def touch(path):
+    """Отмечает нарезку как недавно использованную (prune_cache смотрит на mtime)"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def slice_picture(path, size, pixels, cache_dir=PUZZLE_CACHE_DIR):
+    """Готовит файл нарезки (если его еще нет) и возвращает путь к нему
+
+    Вызывается в фоновом потоке: QImage можно использовать вне GUI-потока.
+    """
+    target = cache_path(picture_digest(path), size, pixels, cache_dir)
+    if os.path.exists(target):
+        touch(target)
+        return target
+
+    image = QImage(path)
+    if image.isNull():
+        raise ValueError(f"Не удалось открыть картинку: {path}")
+    with tracer.span("slice picture", size=size, pixels=pixels):
+        side = min(image.width(), image.height())
+        square = image.copy(QRect((image.width() - side) // 2, (image.height() - side) // 2,
+                                  side, side))
+        scaled = square.scaled(size * pixels, size * pixels,
+                               Qt.AspectRatioMode.IgnoreAspectRatio,
+                               Qt.TransformationMode.SmoothTransformation)
+        scaled = scaled.convertToFormat(PACK_FORMAT)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    header = TILES_HEADER.pack(TILES_MAGIC, TILES_VERSION, size, pixels, scaled.bytesPerLine())
+    temporary = target + ".tmp"
+    with open(temporary, 'wb') as f:
+        f.write(header + b"\0" * (-len(header) % DATA_ALIGN))
+        f.write(scaled.constBits().asstring(scaled.sizeInBytes()))
+    os.replace(temporary, target)
+    prune_cache(cache_dir)
+    return target
+
+
+def prune_cache(cache_dir=PUZZLE_CACHE_DIR, keep=MAX_CACHED_PUZZLES):
+    """Удаляет самые старые нарезки сверх keep"""
+    files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+             if name.endswith(".tiles")]
+    if len(files) <= keep:
+        return
+    files.sort(key=os.path.getmtime)
+    for old in files[:-keep]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+class SlicedPicture:
+    """Файл нарезки, открытый через mmap; фишки - окна в общем буфере"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, self.size, self.pixels, self.bytes_per_line = TILES_HEADER.unpack_from(self.buffer)
+        if magic != TILES_MAGIC or version != TILES_VERSION:
+            raise ValueError(f"{path}: неизвестный формат нарезки")
+        self.offset = TILES_HEADER.size + (-TILES_HEADER.size % DATA_ALIGN)
+        # Окно фишки: от ее первого пикселя до последнего пикселя ее последней строки
+        self.tile_bytes = (self.pixels - 1) * self.bytes_per_line + self.pixels * BYTES_PER_PIXEL
+
+    def tile(self, number):
+        """QImage фишки number (из ее целевой клетки)"""
+        row, col = divmod(number - 1, self.size)
+        offset = (self.offset + row * self.pixels * self.bytes_per_line
+                  + col * self.pixels * BYTES_PER_PIXEL)
+        return mapped_image(self.buffer, offset, self.tile_bytes, self.pixels, self.pixels,
+                            self.bytes_per_line, PACK_FORMAT.value)
+
+
+class SliceJob(QRunnable):
+    """Нарезка картинки в пуле потоков"""
+
+    def __init__(self, picture, pixels):
+        super().__init__()
+        self.picture = picture
+        self.pixels = pixels
+
+    def run(self):
+        try:
+            path = slice_picture(self.picture.path, self.picture.size, self.pixels)
+        except (OSError, ValueError) as e:
+            self.picture.slicing_failed.emit(self.pixels, str(e))
+            return
+        self.picture.sliced.emit(self.pixels, path)
+
+
+class PictureTiles(QObject):
+    """Источник картинок фишек из своей картинки (для BoardWidget)
+
+    pixmap() возвращает None, пока нарезка под нужный размер клетки не
+    готова; когда она готова, испускается ready, и поле перерисовывается.
+    Если хеш картинки уже известен и нарезка есть на диске, она открывается
+    сразу, без фонового потока.
+    """
+
+    ready = pyqtSignal()
+    failed = pyqtSignal(str)
+    # Из фонового потока в GUI-поток: пиксели на фишку, путь к нарезке или ошибка
+    sliced = pyqtSignal(int, str)
+    slicing_failed = pyqtSignal(int, str)
+
+    MAX_PIXMAPS = 1024
+
+    def __init__(self, path, size, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.size = size
+        self.pictures = {}          # пиксели на фишку -> SlicedPicture
+        self.slicing = set()
+        self.pixmaps = OrderedDict()
+        self.sliced.connect(self.on_sliced)
+        self.slicing_failed.connect(self.on_slicing_failed)
+
+    def pixmap(self, number, tile_size, dpr=1.0):
+        key = (number, tile_size, dpr)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            return pixmap
+
+        pixels = round(tile_size * dpr)
+        picture = self.pictures.get(pixels) or self.open_cached(pixels)
+        if picture is None:
+            self.start_slicing(pixels)
+            return None
+        pixmap = QPixmap.fromImage(picture.tile(number))
+        pixmap.setDevicePixelRatio(dpr)
+        self.pixmaps[key] = pixmap
+        while len(self.pixmaps) > self.MAX_PIXMAPS:
+            self.pixmaps.popitem(last=False)
+        return pixmap
+
+    def open_cached(self, pixels):
+        digest = known_digest(self.path)
+        if digest is None or pixels in self.slicing:
+            return None
+        path = cache_path(digest, self.size, pixels)
+        if not os.path.exists(path):
+            return None
+        touch(path)
+        return self.open_picture(pixels, path)
+
+    def open_picture(self, pixels, path):
+        try:
+            picture = SlicedPicture(path)
+        except (OSError, ValueError, struct.error) as e:
+            self.failed.emit(str(e))
+            return None
+        self.pictures[pixels] = picture
+        return picture
+
+    def start_slicing(self, pixels):
+        if pixels in self.slicing:
+            return
+        self.slicing.add(pixels)
+        QThreadPool.globalInstance().start(SliceJob(self, pixels))
+
+    def on_sliced(self, pixels, path):
+        self.slicing.discard(pixels)
+        if self.open_picture(pixels, path) is not None:
+            self.ready.emit()
+
+    def on_slicing_failed(self, pixels, message):
+        # Следующая перерисовка попробует нарезать заново
+        self.slicing.discard(pixels)
+        self.failed.emit(message)
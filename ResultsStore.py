@@ -0,0 +1,296 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from LevelStats import LevelStats
+from MoveLog import MoveLog
+
+DB_PATH = "results.db"
+LEGACY_JSON = "best_results.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    grid_size INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    time REAL NOT NULL,
+    seed INTEGER,
+    optimal INTEGER,
+    finished_at REAL NOT NULL,
+    log BLOB
+);
+CREATE INDEX IF NOT EXISTS games_leaderboard ON games (grid_size, moves, time);
+CREATE INDEX IF NOT EXISTS games_history ON games (grid_size, finished_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS level_stats (
+    grid_size INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+class ResultsStore:
+    """История всех завершенных игр в SQLite (режим WAL)
+
+    Запись идет в фоновом потоке: record() только кладет игру в очередь,
+    поток собирает накопившиеся записи в одну транзакцию. Лучшие результаты
+    по уровням держатся в памяти и обновляются сразу при record(), таблицы
+    лидеров кэшируются и сбрасываются после каждой записи.
+
+    Статистика уровней (LevelStats) хранится в таблице level_stats и
+    обновляется инкрементально той же транзакцией, что и вставка игр.
+
+    Для чтения у каждого потока свое соединение (обычно это только
+    GUI-поток); все они закрываются в close().
+    """
+
+    BATCH_DELAY = 0.05
+    BATCH_SIZE = 100
+
+    def __init__(self, path=DB_PATH, legacy_json=LEGACY_JSON):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.queue = queue.Queue()
+        self.writer = None
+        self.local = threading.local()
+        self.readers = []
+        self.schema_ready = False
+        self.best_cache = None
+        self.stats_cache = None
+        self.leaderboard_cache = {}
+        # Растет при каждом сбросе leaderboard_cache: выборка, начатая до
+        # сброса, не должна попасть в кэш после него
+        self.leaderboard_generation = 0
+        self.lock = threading.Lock()
+
+    def connect(self, check_same_thread=True):
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=check_same_thread)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def open(self):
+        """Соединение для чтения в текущем потоке; при первом открытии создает схему и импортирует JSON"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            # Закрывает соединения close() из своего потока, отсюда check_same_thread=False
+            connection = self.connect(check_same_thread=False)
+            self.local.connection = connection
+            with self.lock:
+                self.readers.append(connection)
+        if not self.schema_ready:
+            self.schema_ready = True
+            with connection:
+                connection.executescript(SCHEMA)
+                columns = [row[1] for row in connection.execute("PRAGMA table_info(games)")]
+                if 'log' not in columns:
+                    # База от версии без записи ходов
+                    connection.execute("ALTER TABLE games ADD COLUMN log BLOB")
+            self.import_legacy_json(connection)
+            if not connection.execute("SELECT value FROM meta WHERE key = 'stats_built'").fetchone():
+                # База без статистики (старая версия или импорт JSON) - строим один раз
+                self.rebuild_stats()
+        return connection
+
+    def import_legacy_json(self, connection):
+        """Однократный перенос лучших результатов из best_results.json"""
+        imported = connection.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+        if imported or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, 'r') as f:
+                best_results = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Не удалось прочитать {self.legacy_json}: {e}")
+            return
+        mtime = os.path.getmtime(self.legacy_json)
+        with connection:
+            for level_key, result in best_results.items():
+                connection.execute(
+                    "INSERT INTO games (grid_size, moves, time, finished_at) VALUES (?, ?, ?, ?)",
+                    (int(level_key), int(result['moves']), float(result['time']), mtime))
+            connection.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)",
+                               (str(time.time()),))
+
+    def record(self, grid_size, moves, elapsed_time, seed=None, optimal=None, log=None):
+        """Ставит игру в очередь на запись и сразу обновляет кэш лучших результатов
+
+        log - запись ходов партии (MoveLog), хранится в сжатом виде для повторов.
+        """
+        game = (grid_size, moves, elapsed_time, seed, optimal, time.time(),
+                log.to_bytes() if log is not None else None)
+        # Кэши нужны до постановки в очередь, иначе они прочитаются без этой игры
+        self.best_results()
+        self.level_stats()
+        with self.lock:
+            self.stats_cache.setdefault(grid_size, LevelStats()).add(moves, elapsed_time)
+            best = self.best_cache.get(str(grid_size))
+            if best is None or (moves, elapsed_time) < (best['moves'], best['time']):
+                self.best_cache[str(grid_size)] = {'moves': moves, 'time': elapsed_time}
+            self.leaderboard_cache.pop(grid_size, None)
+            self.leaderboard_generation += 1
+        self.ensure_writer()
+        self.queue.put(game)
+
+    def ensure_writer(self):
+        if self.writer is None:
+            # Схема должна существовать до первой записи
+            self.open()
+            self.writer = threading.Thread(target=self.write_loop, name="results-writer", daemon=True)
+            self.writer.start()
+
+    def write_loop(self):
+        connection = self.connect()
+        while True:
+            game = self.queue.get()
+            if game is None:
+                break
+            batch = [game]
+            deadline = time.monotonic() + self.BATCH_DELAY
+            stop = False
+            while len(batch) < self.BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    game = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if game is None:
+                    stop = True
+                    break
+                batch.append(game)
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO games (grid_size, moves, time, seed, optimal, finished_at, log) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                    self.update_stats(connection, batch)
+            except sqlite3.Error as e:
+                print(f"Ошибка при сохранении результатов: {e}")
+            with self.lock:
+                for game in batch:
+                    self.leaderboard_cache.pop(game[0], None)
+                self.leaderboard_generation += 1
+            if stop:
+                break
+        connection.close()
+
+    def update_stats(self, connection, batch):
+        """Дописывает игры пакета в сохраненную статистику уровней"""
+        for grid_size in {game[0] for game in batch}:
+            row = connection.execute("SELECT data FROM level_stats WHERE grid_size = ?",
+                                     (grid_size,)).fetchone()
+            stats = LevelStats.from_dict(json.loads(row[0])) if row else LevelStats()
+            for game in batch:
+                if game[0] == grid_size:
+                    stats.add(game[1], game[2])
+            connection.execute("INSERT OR REPLACE INTO level_stats (grid_size, data) VALUES (?, ?)",
+                               (grid_size, json.dumps(stats.to_dict())))
+
+    def rebuild_stats(self):
+        """Пересчет статистики по всей истории (единственное место с полным проходом)"""
+        self.flush()
+        connection = self.open()
+        stats = {}
+        rows = connection.execute("SELECT grid_size, moves, time FROM games ORDER BY finished_at, id")
+        for grid_size, moves, elapsed_time in rows:
+            stats.setdefault(grid_size, LevelStats()).add(moves, elapsed_time)
+        with connection:
+            connection.execute("DELETE FROM level_stats")
+            connection.executemany("INSERT INTO level_stats (grid_size, data) VALUES (?, ?)",
+                                   [(grid_size, json.dumps(level.to_dict()))
+                                    for grid_size, level in stats.items()])
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stats_built', ?)",
+                               (str(time.time()),))
+        with self.lock:
+            self.stats_cache = stats
+        return stats
+
+    def flush(self):
+        """Дожидается записи всего, что стоит в очереди, и останавливает поток"""
+        if self.writer is not None:
+            self.queue.put(None)
+            self.writer.join()
+            self.writer = None
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            readers, self.readers = self.readers, []
+        for connection in readers:
+            connection.close()
+        # Следующее открытие (например, после смены path) начнется заново
+        self.local = threading.local()
+        self.schema_ready = False
+
+    def best_results(self):
+        """Лучший результат по каждому уровню в формате старого best_results.json"""
+        with self.lock:
+            if self.best_cache is not None:
+                return dict(self.best_cache)
+        rows = self.open().execute(
+            "SELECT grid_size, moves, time FROM games AS g WHERE id = ("
+            "  SELECT id FROM games WHERE grid_size = g.grid_size ORDER BY moves, time LIMIT 1)"
+        ).fetchall()
+        best = {str(grid_size): {'moves': moves, 'time': elapsed} for grid_size, moves, elapsed in rows}
+        with self.lock:
+            if self.best_cache is None:
+                self.best_cache = best
+            return dict(self.best_cache)
+
+    def level_stats(self):
+        """Статистика всех уровней: размер поля -> LevelStats"""
+        with self.lock:
+            if self.stats_cache is not None:
+                return self.stats_cache
+        rows = self.open().execute("SELECT grid_size, data FROM level_stats").fetchall()
+        stats = {grid_size: LevelStats.from_dict(json.loads(data)) for grid_size, data in rows}
+        with self.lock:
+            if self.stats_cache is None:
+                self.stats_cache = stats
+            return self.stats_cache
+
+    def leaderboard(self, grid_size, limit=10):
+        """Лучшие игры уровня: меньше ходов, при равенстве - быстрее
+
+        В кэше лежит (limit, строки). Выборка короче своего limit - это все
+        игры уровня, ею отвечают на любой limit.
+        """
+        with self.lock:
+            cached = self.leaderboard_cache.get(grid_size)
+            generation = self.leaderboard_generation
+        if cached is not None:
+            cached_limit, rows = cached
+            if cached_limit >= limit or len(rows) < cached_limit:
+                return rows[:limit]
+        rows = self.open().execute(
+            "SELECT id, moves, time, seed, optimal, finished_at, log IS NOT NULL FROM games "
+            "WHERE grid_size = ? ORDER BY moves, time LIMIT ?", (grid_size, limit)).fetchall()
+        with self.lock:
+            # Пока шла выборка, поток записи мог сохранить игру и сбросить кэш
+            if generation == self.leaderboard_generation:
+                self.leaderboard_cache[grid_size] = (limit, rows)
+        return rows
+
+    def history(self, grid_size, limit=-1):
+        """Последние игры уровня, новые первыми (limit=-1 - все)"""
+        return self.open().execute(
+            "SELECT id, moves, time, seed, optimal, finished_at, log IS NOT NULL FROM games "
+            "WHERE grid_size = ? ORDER BY finished_at DESC LIMIT ?", (grid_size, limit)).fetchall()
+
+    def game_log(self, game_id):
+        """Запись ходов сохраненной игры (None, если ее нет)"""
+        row = self.open().execute("SELECT log FROM games WHERE id = ?", (game_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return MoveLog.from_bytes(row[0])
+
+
+results_store = ResultsStore()
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+
+from PyQt6.QtCore import QTimer
+
+from GameScreen import GameScreen
+from Tracing import tracer
+from VictoryScreen import VictoryScreen
+
+
+class ScreenManager:
+    """Жизненный цикл экранов в QStackedWidget
+
+    Игровой экран создается один раз на размер поля и дальше только
+    сбрасывается (новое перемешивание), а не пересобирается. Экраны победы
+    временные: при уходе с них они удаляются из стека и уничтожаются через
+    deleteLater. Пока игрок на экране выбора уровня, в простое заранее
+    строится экран для наиболее вероятного следующего уровня.
+    """
+
+    MAX_GAME_SCREENS = 3
+
+    def __init__(self, stacked_widget, level_screen, background_image):
+        self.stacked_widget = stacked_widget
+        self.level_screen = level_screen
+        self.background_image = background_image
+        self.game_screens = OrderedDict()   # размер поля -> GameScreen (LRU)
+        self.transient = []                 # экраны, которые нужно уничтожить при уходе
+        self.last_level = None
+        self.last_won = False
+
+    def game_screen(self, grid_size):
+        """Готовый экран для размера поля: из кэша или новый"""
+        if grid_size in self.game_screens:
+            self.game_screens.move_to_end(grid_size)
+            return self.game_screens[grid_size]
+
+        with tracer.span("GameScreen build", grid_size=grid_size):
+            screen = GameScreen(grid_size)
+            screen.set_background(self.background_image)
+        screen.back_requested.connect(self.show_level)
+        screen.game_won.connect(self.show_victory)
+        self.stacked_widget.addWidget(screen)
+        self.game_screens[grid_size] = screen
+        self.evict_game_screens()
+        return screen
+
+    def evict_game_screens(self):
+        current = self.stacked_widget.currentWidget()
+        for grid_size in list(self.game_screens):
+            if len(self.game_screens) <= self.MAX_GAME_SCREENS:
+                break
+            screen = self.game_screens[grid_size]
+            if screen is current:
+                continue
+            del self.game_screens[grid_size]
+            self.destroy(screen)
+
+    def show_game(self, grid_size, difficulty=None):
+        """Показывает экран уровня и начинает новую игру"""
+        screen = self.game_screen(grid_size)
+        self.last_level = grid_size
+        self.last_won = False
+        screen.init_game(difficulty)
+        self.switch_to(screen)
+        return screen
+
+    def resume_game(self, session):
+        """Продолжение партии из журнала (SavedSession)"""
+        screen = self.game_screen(session.log.size)
+        self.last_level = session.log.size
+        self.last_won = False
+        screen.resume_game(session)
+        self.switch_to(screen)
+        return screen
+
+    def show_level(self):
+        """Возврат к выбору уровня"""
+        self.level_screen.update_results()
+        self.switch_to(self.level_screen)
+        # Следующий уровень готовим, когда цикл событий освободится
+        QTimer.singleShot(0, self.prebuild_next_level)
+
+    def show_victory(self, moves, elapsed_time, grid_size):
+        self.last_won = True
+        victory_screen = VictoryScreen(moves, elapsed_time, grid_size)
+        victory_screen.menu_btn.clicked.connect(self.show_level)
+        # Запись берем сейчас: следующая игра на этом экране начнет новую
+        log = self.game_screens[grid_size].log
+        victory_screen.replay_btn.clicked.connect(lambda: self.show_replay(log))
+        self.stacked_widget.addWidget(victory_screen)
+        self.switch_to(victory_screen)
+        self.transient.append(victory_screen)
+
+    def show_replay(self, log):
+        """Повтор сохраненной партии (MoveLog) на игровом экране ее размера"""
+        screen = self.game_screen(log.size)
+        screen.start_replay(log)
+        self.switch_to(screen)
+        return screen
+
+    def switch_to(self, screen):
+        self.stacked_widget.setCurrentWidget(screen)
+        # Временные экраны, с которых ушли, больше не нужны
+        for old in [old for old in self.transient if old is not screen]:
+            self.transient.remove(old)
+            self.destroy(old)
+
+    def destroy(self, screen):
+        self.stacked_widget.removeWidget(screen)
+        screen.deleteLater()
+
+    def likely_next_level(self):
+        """После победы - следующий по сложности уровень, после выхода - тот же, сначала - младший"""
+        levels = sorted(self.level_screen.buttons)
+        if self.last_level is None:
+            return levels[0]
+        if self.last_won:
+            harder = [level for level in levels if level > self.last_level]
+            if harder:
+                return harder[0]
+        return self.last_level
+
+    def prebuild_next_level(self):
+        if self.stacked_widget.currentWidget() is self.level_screen:
+            self.game_screen(self.likely_next_level())
@@ -0,0 +1,198 @@
+"""Журнал текущей партии для восстановления после закрытия или сбоя
+
+Файл состоит из записей "<BII": тип, длина, crc32 содержимого. Первая
+запись - снимок (счетчик ходов, время и MoveLog партии целиком), дальше
+идут пакеты событий. Событие - один байт: направление пустой клетки
+(0-3) для нового хода, UNDO или REDO. Оборванная при сбое последняя
+запись отбрасывается по crc.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from MoveLog import MoveLog
+
+JOURNAL_PATH = "session.journal"
+
+RECORD = struct.Struct("<BII")
+STATE = struct.Struct("<Id")
+SNAPSHOT, EVENTS = 1, 2
+UNDO, REDO = 4, 5
+
+
+class SavedSession:
+    """Партия, восстановленная из журнала"""
+
+    def __init__(self, log, moves, elapsed_time):
+        self.log = log
+        self.moves = moves
+        self.elapsed_time = elapsed_time
+
+    def apply(self, events):
+        for event in events:
+            if event == UNDO:
+                self.log.undo()
+            elif event == REDO:
+                self.log.redo()
+            else:
+                self.log.append(event)
+
+
+class SessionJournal:
+    """Журнал в режиме только добавления, запись идет в фоновом потоке
+
+    GUI-поток только кладет событие в очередь. Поток записи собирает
+    события за FLUSH_INTERVAL в одну запись и делает один fsync, ведет
+    свою копию партии и после COMPACT_EVENTS событий переписывает файл
+    одним снимком.
+    """
+
+    FLUSH_INTERVAL = 0.5
+    COMPACT_EVENTS = 2000
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.queue = queue.Queue()
+        self.writer = None
+
+    # --- GUI-поток ---
+
+    def start(self, log, moves=0, elapsed_time=0.0):
+        """Новая (или восстановленная) партия: журнал начинается с ее снимка"""
+        self.put(('start', log.to_bytes(), moves, elapsed_time))
+
+    def record(self, event, moves, elapsed_time):
+        """Ход, отмена или повтор (event=None - только обновить счетчики)"""
+        self.put(('event', event, moves, elapsed_time))
+
+    def finish(self):
+        """Партия закончена - восстанавливать нечего"""
+        self.put(('finish',))
+
+    def put(self, command):
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write_loop, name="session-journal", daemon=True)
+            self.writer.start()
+        self.queue.put(command)
+
+    def close(self):
+        """Дописывает очередь на диск и останавливает поток"""
+        if self.writer is not None:
+            self.queue.put(None)
+            self.writer.join()
+            self.writer = None
+
+    # --- поток записи ---
+
+    def write_loop(self):
+        file = None
+        session = None
+        events = bytearray()
+        since_snapshot = 0
+        while True:
+            command = self.queue.get()
+            stop = command is None
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while not stop:
+                kind = command[0]
+                if kind == 'start':
+                    _, data, moves, elapsed_time = command
+                    session = SavedSession(MoveLog.from_bytes(data), moves, elapsed_time)
+                    events.clear()
+                    file = self.write_snapshot(file, session)
+                    since_snapshot = 0
+                elif kind == 'event' and session is not None:
+                    _, event, session.moves, session.elapsed_time = command
+                    if event is not None:
+                        session.apply((event,))
+                        events.append(event)
+                        since_snapshot += 1
+                elif kind == 'finish':
+                    session = None
+                    events.clear()
+                    file = self.remove(file)
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    command = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                stop = command is None
+
+            if session is not None and file is not None:
+                if since_snapshot >= self.COMPACT_EVENTS:
+                    file = self.write_snapshot(file, session)
+                    since_snapshot = 0
+                else:
+                    self.append(file, EVENTS, STATE.pack(session.moves, session.elapsed_time) + events)
+                    os.fsync(file.fileno())
+                events.clear()
+            if stop:
+                break
+        if file is not None:
+            file.close()
+
+    def append(self, file, kind, payload):
+        file.write(RECORD.pack(kind, len(payload), zlib.crc32(payload)) + payload)
+        file.flush()
+
+    def write_snapshot(self, file, session):
+        """Переписывает журнал одним снимком (атомарно через временный файл)"""
+        if file is not None:
+            file.close()
+        temporary = self.path + ".tmp"
+        with open(temporary, 'wb') as snapshot:
+            self.append(snapshot, SNAPSHOT,
+                        STATE.pack(session.moves, session.elapsed_time) + session.log.to_bytes())
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, self.path)
+        return open(self.path, 'ab')
+
+    def remove(self, file):
+        if file is not None:
+            file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return None
+
+    # --- восстановление ---
+
+    def load(self):
+        """Незаконченная партия из журнала или None"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        session = None
+        offset = 0
+        while offset + RECORD.size <= len(data):
+            kind, length, checksum = RECORD.unpack_from(data, offset)
+            payload = data[offset + RECORD.size:offset + RECORD.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                # Запись оборвалась при сбое - все до нее цело
+                break
+            moves, elapsed_time = STATE.unpack_from(payload)
+            if kind == SNAPSHOT:
+                try:
+                    log = MoveLog.from_bytes(payload[STATE.size:])
+                except ValueError:
+                    return None
+                session = SavedSession(log, moves, elapsed_time)
+            elif kind == EVENTS and session is not None:
+                session.apply(payload[STATE.size:])
+                session.moves, session.elapsed_time = moves, elapsed_time
+            offset += RECORD.size + length
+        return session
+
+    def discard(self):
+        self.finish()
+
+
+session_journal = SessionJournal()
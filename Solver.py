@@ -0,0 +1,297 @@
+import time
+
+from Board import Board, DIRECTIONS, OPPOSITE
+
+FOUND = -1
+INFINITY = 1 << 30
+
+
+class SearchStopped(Exception):
+    """Поиск остановлен: исчерпан бюджет узлов/времени или запрошена отмена"""
+
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class ManhattanLinearConflict:
+    """Манхэттенское расстояние + линейные конфликты, пересчитываемые инкрементально
+
+    При сдвиге фишки меняются только две линии: при горизонтальном ходе - два
+    столбца, при вертикальном - две строки. Остальные линии не трогаются.
+    """
+
+    name = "manhattan+lc"
+
+    def __init__(self, size):
+        self.size = size
+        count = size * size
+        self.goal_row = [0] + [(tile - 1) // size for tile in range(1, count)]
+        self.goal_col = [0] + [(tile - 1) % size for tile in range(1, count)]
+        # dist[tile][index] - манхэттенское расстояние фишки до своего места
+        self.dist = [[0] * count]
+        for tile in range(1, count):
+            self.dist.append([abs(index // size - self.goal_row[tile]) +
+                              abs(index % size - self.goal_col[tile])
+                              for index in range(count)])
+        self.row_lc = [0] * size
+        self.col_lc = [0] * size
+        self.scratch = [0] * size
+        self.lis = [0] * size
+        self.md = 0
+        self.lc = 0
+
+    def reset(self, cells):
+        size = self.size
+        self.md = sum(self.dist[tile][index] for index, tile in enumerate(cells))
+        for line in range(size):
+            self.row_lc[line] = self.row_conflicts(cells, line)
+            self.col_lc[line] = self.col_conflicts(cells, line)
+        self.lc = sum(self.row_lc) + sum(self.col_lc)
+        return self.md + 2 * self.lc
+
+    def move(self, cells, tile, src, dst):
+        """Фишка tile перешла из src в dst (cells уже обновлен). Возвращает новое h"""
+        size = self.size
+        self.md += self.dist[tile][dst] - self.dist[tile][src]
+        src_row, src_col = divmod(src, size)
+        dst_row, dst_col = divmod(dst, size)
+        if src_row == dst_row:
+            # Горизонтальный ход: порядок в строке не меняется, меняются столбцы
+            goal = self.goal_col[tile]
+            if goal == src_col or goal == dst_col:
+                col_lc = self.col_lc
+                old = col_lc[src_col] + col_lc[dst_col]
+                col_lc[src_col] = self.col_conflicts(cells, src_col)
+                col_lc[dst_col] = self.col_conflicts(cells, dst_col)
+                self.lc += col_lc[src_col] + col_lc[dst_col] - old
+        else:
+            goal = self.goal_row[tile]
+            if goal == src_row or goal == dst_row:
+                row_lc = self.row_lc
+                old = row_lc[src_row] + row_lc[dst_row]
+                row_lc[src_row] = self.row_conflicts(cells, src_row)
+                row_lc[dst_row] = self.row_conflicts(cells, dst_row)
+                self.lc += row_lc[src_row] + row_lc[dst_row] - old
+        return self.md + 2 * self.lc
+
+    def row_conflicts(self, cells, row):
+        """Сколько фишек строки нужно убрать, чтобы не осталось конфликтов"""
+        size = self.size
+        goal_row = self.goal_row
+        goal_col = self.goal_col
+        scratch = self.scratch
+        k = 0
+        start = row * size
+        for index in range(start, start + size):
+            tile = cells[index]
+            if tile and goal_row[tile] == row:
+                scratch[k] = goal_col[tile]
+                k += 1
+        return k - self.longest_increasing(k) if k > 1 else 0
+
+    def col_conflicts(self, cells, col):
+        size = self.size
+        goal_row = self.goal_row
+        goal_col = self.goal_col
+        scratch = self.scratch
+        k = 0
+        for index in range(col, size * size, size):
+            tile = cells[index]
+            if tile and goal_col[tile] == col:
+                scratch[k] = goal_row[tile]
+                k += 1
+        return k - self.longest_increasing(k) if k > 1 else 0
+
+    def longest_increasing(self, k):
+        """Длина наибольшей возрастающей подпоследовательности scratch[:k]"""
+        scratch = self.scratch
+        lis = self.lis
+        best = 0
+        for a in range(k):
+            length = 1
+            value = scratch[a]
+            for b in range(a):
+                if scratch[b] < value and lis[b] >= length:
+                    length = lis[b] + 1
+            lis[a] = length
+            if length > best:
+                best = length
+        return best
+
+
+class Solution:
+    """Результат поиска"""
+
+    def __init__(self, moves, nodes, elapsed, status, heuristic):
+        self.moves = moves          # направления движения пустой клетки
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.status = status        # 'solved', 'budget', 'timeout', 'cancelled'
+        self.heuristic = heuristic
+
+    @property
+    def solved(self):
+        return self.status == 'solved'
+
+    @property
+    def length(self):
+        return len(self.moves) if self.moves is not None else None
+
+    def tile_indices(self, board):
+        """Переводит ходы в индексы клеток, по которым нужно кликать"""
+        size = board.size
+        empty = board.empty
+        indices = []
+        for direction in self.moves:
+            di, dj = DIRECTIONS[direction]
+            empty += di * size + dj
+            indices.append(empty)
+        return indices
+
+
+class Solver:
+    """Оптимальный решатель IDA*
+
+    Поиск идет на одном плоском списке клеток: ход и откат делаются на месте,
+    копий поля на узел не создается. max_nodes и time_limit ограничивают
+    работу решателя, при превышении возвращается Solution со статусом
+    'budget' или 'timeout'. should_cancel() опрашивается вместе с бюджетом
+    (кооперативная отмена), progress(nodes, elapsed, bound) вызывается при
+    каждой проверке и при смене порога.
+    """
+
+    CHECK_INTERVAL = 4096
+
+    def __init__(self, size, heuristic=None, max_nodes=None, time_limit=None,
+                 progress=None, should_cancel=None):
+        self.size = size
+        self.heuristic = heuristic or ManhattanLinearConflict(size)
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.progress = progress
+        self.should_cancel = should_cancel
+        # neighbors[index] - пары (направление, индекс клетки) для пустой клетки
+        self.neighbors = []
+        for index in range(size * size):
+            i, j = divmod(index, size)
+            pairs = []
+            for direction, (di, dj) in enumerate(DIRECTIONS):
+                ni, nj = i + di, j + dj
+                if 0 <= ni < size and 0 <= nj < size:
+                    pairs.append((direction, ni * size + nj))
+            self.neighbors.append(tuple(pairs))
+
+    def solve(self, board):
+        """Ищет оптимальное решение для Board или списка фишек"""
+        if not isinstance(board, Board):
+            board = Board(self.size, list(board))
+        tiles = board.tiles()
+        if not Board.is_solvable(tiles, self.size):
+            raise ValueError("Расстановка не имеет решения")
+
+        self.cells = tiles
+        self.empty = tiles.index(0)
+        self.path = []
+        self.nodes = 0
+        self.started = time.perf_counter()
+        self.h = self.heuristic.reset(self.cells)
+        bound = self.bound = self.h
+        status = 'solved'
+        try:
+            while True:
+                result = self.search(0, bound, -1)
+                if result == FOUND:
+                    break
+                bound = self.bound = result
+                self.on_bound(bound)
+        except SearchStopped as stop:
+            status = stop.status
+        elapsed = time.perf_counter() - self.started
+        moves = list(self.path) if status == 'solved' else None
+        return Solution(moves, self.nodes, elapsed, status, self.heuristic.name)
+
+    def on_bound(self, bound):
+        """Вызывается при увеличении порога IDA*"""
+        if self.progress:
+            self.progress(self.nodes, time.perf_counter() - self.started, bound)
+
+    def check_budget(self):
+        """Периодическая проверка бюджета (каждые CHECK_INTERVAL узлов)"""
+        if self.should_cancel is not None and self.should_cancel():
+            raise SearchStopped('cancelled')
+        if self.progress:
+            self.progress(self.nodes, time.perf_counter() - self.started, self.bound)
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchStopped('budget')
+        if self.time_limit is not None and time.perf_counter() - self.started >= self.time_limit:
+            raise SearchStopped('timeout')
+
+    def search(self, g, bound, previous):
+        h = self.h
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0:
+            return FOUND
+
+        self.nodes += 1
+        if self.nodes % self.CHECK_INTERVAL == 0:
+            self.check_budget()
+
+        cells = self.cells
+        heuristic = self.heuristic
+        empty = self.empty
+        forbidden = OPPOSITE[previous] if previous >= 0 else -1
+        minimum = INFINITY
+
+        for direction, target in self.neighbors[empty]:
+            if direction == forbidden:
+                continue
+            tile = cells[target]
+            cells[empty] = tile
+            cells[target] = 0
+            self.empty = target
+            self.h = heuristic.move(cells, tile, target, empty)
+            self.path.append(direction)
+
+            result = self.search(g + 1, bound, direction)
+            if result == FOUND:
+                return FOUND
+
+            self.path.pop()
+            cells[target] = tile
+            cells[empty] = 0
+            self.empty = empty
+            heuristic.move(cells, tile, empty, target)
+            self.h = h
+            if result < minimum:
+                minimum = result
+
+        return minimum
+
+
+def default_heuristic(size):
+    """Самая сильная из доступных эвристик для размера поля
+
+    3x3: точная таблица расстояний, если она построена (поиск идет прямо по
+    оптимальному пути), иначе база шаблонов 4-4 - с диска или собранная в
+    памяти за доли секунды. Больше: база шаблонов, если ее файлы построены,
+    иначе манхэттен + конфликты.
+    """
+    from PatternDB import PatternDatabase
+    if size == 3:
+        from DistanceTable import DistanceTable
+        table = DistanceTable.shared()
+        if table is not None:
+            return table
+    database = PatternDatabase.find(size)
+    if database is None and size == 3:
+        database = PatternDatabase.build(size)
+    return database or ManhattanLinearConflict(size)
+
+
+def solve(board, max_nodes=None, time_limit=None):
+    """Упрощенный вызов решателя для готового Board"""
+    return Solver(board.size, default_heuristic(board.size),
+                  max_nodes=max_nodes, time_limit=time_limit).solve(board)
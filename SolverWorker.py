@@ -0,0 +1,196 @@
+import multiprocessing
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, pyqtSignal
+
+from Solver import Solver, default_heuristic
+
+
+def serve(conn):
+    """Точка входа процесса решателя: задачи по одной, пока родитель не закроет Pipe
+
+    Задача - ('solve', size, tiles, max_nodes, time_limit), ответ -
+    ('done', Solution) или ('error', текст), по ходу - ('progress', ...).
+    Отмена кооперативная: родитель присылает 'cancel', решатель замечает его
+    при очередной проверке бюджета. Эвристики (и отображенные в память базы
+    шаблонов) живут между задачами.
+    """
+    heuristics = {}
+
+    def progress(nodes, elapsed, bound):
+        conn.send(('progress', nodes, elapsed, bound))
+
+    def should_cancel():
+        return conn.poll() and conn.recv() == 'cancel'
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        if message == 'cancel':
+            # Отмена уже решенной задачи
+            continue
+        _, size, tiles, max_nodes, time_limit = message
+        try:
+            if size not in heuristics:
+                heuristics[size] = default_heuristic(size)
+            solver = Solver(size, heuristics[size], max_nodes=max_nodes, time_limit=time_limit,
+                            progress=progress, should_cancel=should_cancel)
+            conn.send(('done', solver.solve(tiles)))
+        except Exception as e:
+            conn.send(('error', str(e)))
+    conn.close()
+
+
+class SolverProcess:
+    """Постоянный процесс решателя для задач с use_process
+
+    Процесс запускается при первой такой задаче и живет до выхода: spawn
+    заново импортирует главный модуль (вместе с PyQt6), и делать это на каждую
+    подсказку слишком дорого. Задачи идут через него по одной.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.quit_connected = False
+
+    def connection(self):
+        """Pipe к процессу; упавший процесс перезапускается (вызывать под lock)"""
+        if self.process is None or not self.process.is_alive():
+            self.close_process()
+            # spawn: форк процесса с живым Qt и потоками небезопасен
+            context = multiprocessing.get_context('spawn')
+            self.conn, child_conn = context.Pipe()
+            self.process = context.Process(target=serve, args=(child_conn,),
+                                           name="solver", daemon=True)
+            self.process.start()
+            child_conn.close()
+        return self.conn
+
+    def stop_on_quit(self):
+        """Подключает shutdown к выходу из приложения (один раз, из GUI-потока)"""
+        if not self.quit_connected:
+            self.quit_connected = True
+            QCoreApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    def close_process(self):
+        if self.process is None:
+            return
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.process = None
+        self.conn = None
+
+    def shutdown(self):
+        """Останавливает процесс (на выходе из приложения)"""
+        if self.process is not None and self.process.is_alive():
+            # Идущий поиск не дожидаемся: результат уже никому не нужен
+            self.process.terminate()
+        with self.lock:
+            self.close_process()
+
+
+solver_process = SolverProcess()
+
+
+class SolverSignals(QObject):
+    """Сигналы задачи поиска (доставляются в GUI-поток через очередь Qt)"""
+    progress = pyqtSignal(int, float, int, float)   # узлы, узлов/с, порог, секунды
+    finished = pyqtSignal(object)                   # Solution
+    failed = pyqtSignal(str)
+
+
+class SolverJob(QRunnable):
+    """Задача поиска для QThreadPool
+
+    В режиме use_process сам поиск идет в постоянном процессе решателя
+    (solver_process, без GIL), а поток пула только пересылает прогресс и
+    команду отмены. Задачу после run() удаляет пул (autoDelete), поэтому ее
+    не нужно держать до конца поиска: отмененную задачу можно сразу забыть.
+    """
+
+    PROGRESS_INTERVAL = 0.1
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, size, tiles, max_nodes=None, time_limit=None, use_process=False):
+        super().__init__()
+        self.size = size
+        self.tiles = list(tiles)
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.use_process = use_process
+        self.signals = SolverSignals()
+        self.cancel_event = threading.Event()
+        self.last_progress = 0.0
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def start(self, pool=None):
+        if self.use_process:
+            # Слот, подключенный из потока пула, вызывался бы в этом потоке
+            solver_process.stop_on_quit()
+        (pool or QThreadPool.globalInstance()).start(self)
+
+    def report(self, nodes, elapsed, bound, force=False):
+        """Шлет прогресс не чаще PROGRESS_INTERVAL, чтобы не засыпать очередь событий"""
+        now = time.perf_counter()
+        if force or now - self.last_progress >= self.PROGRESS_INTERVAL:
+            self.last_progress = now
+            rate = nodes / elapsed if elapsed > 0 else 0.0
+            self.emit('progress', nodes, rate, bound, elapsed)
+
+    def emit(self, name, *args):
+        try:
+            getattr(self.signals, name).emit(*args)
+        except RuntimeError:
+            # Объект сигналов уже удален (приложение закрывается)
+            self.cancel()
+
+    def run(self):
+        try:
+            if self.use_process:
+                solution = self.run_in_process()
+            else:
+                solver = Solver(self.size, default_heuristic(self.size),
+                                max_nodes=self.max_nodes, time_limit=self.time_limit,
+                                progress=self.report, should_cancel=self.cancel_event.is_set)
+                solution = solver.solve(self.tiles)
+        except Exception as e:
+            self.emit('failed', str(e))
+            return
+        self.emit('finished', solution)
+
+    def run_in_process(self):
+        with solver_process.lock:
+            conn = solver_process.connection()
+            conn.send(('solve', self.size, self.tiles, self.max_nodes, self.time_limit))
+            cancel_sent = False
+            while True:
+                if self.cancelled and not cancel_sent:
+                    conn.send('cancel')
+                    cancel_sent = True
+                if not conn.poll(self.POLL_INTERVAL):
+                    if not solver_process.process.is_alive():
+                        raise RuntimeError("Процесс решателя завершился без результата")
+                    continue
+                message = conn.recv()
+                if message[0] == 'progress':
+                    self.report(*message[1:])
+                elif message[0] == 'error':
+                    raise RuntimeError(message[1])
+                else:
+                    return message[1]
@@ -0,0 +1,107 @@
+"""Сторожевой поток, ловящий зависания цикла событий Qt
+
+Таймер в GUI-потоке отмечает каждое срабатывание; фоновый поток
+проверяет давность последней отметки. Если цикл событий молчит дольше
+порога, поток снимает стек главного потока через sys._current_frames()
+каждые SAMPLE_INTERVAL и копит стеки в свернутом виде ("a;b;c N"),
+который понимают flamegraph.pl и speedscope. Каждое зависание пишется
+в лог, а при включенной трассировке - и в трейс.
+
+Включается флагом --watchdog [мс] у Laba3.py или переменной окружения
+GAME15_WATCHDOG=мс.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from PyQt6.QtCore import Qt, QTimer
+
+from Tracing import tracer
+
+WATCHDOG_ENV = "GAME15_WATCHDOG"
+STALLS_PATH = "stalls.folded"
+
+
+def folded_stack(frame):
+    """Стек от корня к текущей функции: "func (file:line);..." """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StallWatchdog:
+    """Пинг цикла событий и выборка стеков главного потока во время зависаний"""
+
+    PING_INTERVAL = 10          # мс
+    SAMPLE_INTERVAL = 0.005     # с
+
+    def __init__(self, threshold_ms=50, path=STALLS_PATH):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.samples = Counter()    # свернутый стек -> число выборок
+        self.stalls = []            # (начало, длительность в мс, самый частый стек)
+        self.main_thread = threading.main_thread().ident
+        self.last_beat = time.perf_counter()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.timer = None
+
+    def start(self):
+        """Запускать из GUI-потока: таймер пинга живет в нем"""
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.beat)
+        self.timer.start(self.PING_INTERVAL)
+        self.last_beat = time.perf_counter()
+        self.thread = threading.Thread(target=self.watch, name="stall-watchdog", daemon=True)
+        self.thread.start()
+
+    def beat(self):
+        self.last_beat = time.perf_counter()
+
+    def watch(self):
+        # Нормальная давность отметки - до одного интервала пинга
+        limit = self.threshold + self.PING_INTERVAL / 1000
+        while not self.stopping.wait(self.SAMPLE_INTERVAL):
+            beat = self.last_beat
+            if time.perf_counter() - beat <= limit:
+                continue
+            stall_samples = Counter()
+            while self.last_beat == beat and not self.stopping.is_set():
+                frame = sys._current_frames().get(self.main_thread)
+                if frame is not None:
+                    stall_samples[folded_stack(frame)] += 1
+                del frame
+                time.sleep(self.SAMPLE_INTERVAL)
+            self.report(beat, time.perf_counter(), stall_samples)
+
+    def report(self, start, end, stall_samples):
+        duration = (end - start) * 1000
+        self.samples.update(stall_samples)
+        top = stall_samples.most_common(1)[0][0] if stall_samples else "?"
+        self.stalls.append((start, duration, top))
+        print(f"Зависание GUI {duration:.0f} мс в {top.rsplit(';', 1)[-1]}", file=sys.stderr)
+        if tracer.enabled:
+            tracer.complete("GUI stall", int(start * 1e9), int(end * 1e9),
+                            {'stack': top}, category="stall")
+
+    def stop(self):
+        """Останавливает поток и пишет накопленные стеки"""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+        self.timer.stop()
+        with open(self.path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        if self.stalls:
+            worst = max(duration for _, duration, _ in self.stalls)
+            print(f"Зависаний GUI: {len(self.stalls)}, худшее {worst:.0f} мс, стеки в {self.path}",
+                  file=sys.stderr)
@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QVBoxLayout, QPushButton, QLabel, QWidget, QHBoxLayout
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QFontDatabase
+from AssetPack import load_font, FONT_PATH
 from Background import BackgroundWidget
 
 class StartScreen(BackgroundWidget):
@@ -17,41 +18,16 @@ class StartScreen(BackgroundWidget):
         layout.setContentsMargins(50, 50, 50, 50)  # Отступы от краев
         # Заголовок
 
-        font_id = QFontDatabase.addApplicationFont("Fonts/PressStart2P-Regular.ttf")
-        if font_id != -1:
-            font_family = QFontDatabase.applicationFontFamilies(font_id)[0]
-            custom_font = QFont(font_family, 24, QFont.Weight.Bold)
-        else:
-            custom_font = QFont("Arial", 24, QFont.Weight.Bold)
-
+        # Свой шрифт регистрируется после первого кадра (load_custom_font)
         title = QLabel("Игра в 15")
-        title.setFont(custom_font)
+        title.setFont(QFont("Arial", 24, QFont.Weight.Bold))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-                   QLabel {
-                       color: #FF1493; 
-                       margin: 20px;
-                       background: rgba(255, 255, 255, 0.7);
-                       border-radius: 10px;
-                       padding: 20px;
-                   }
-               """)
+        title.setProperty("role", "start-title")
 
         # Кнопка
         start_btn = QPushButton("Начать игру")
         start_btn.setMinimumSize(400, 100)
-        start_btn.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(0, 0, 0, 0.9);
-                color: white;
-                border: none;
-                border-radius: 20px;
-                font-size: 24px;
-            }
-            QPushButton:hover {
-                background-color: rgba(188, 143, 143, 0.9);
-            }
-        """)
+        start_btn.setProperty("role", "start")
 
         # Компоновка
         layout.addStretch()  # Растягивающее пространство сверху
@@ -61,4 +37,12 @@ class StartScreen(BackgroundWidget):
         layout.addStretch()  # Растягивающее пространство снизу
 
         self.setLayout(layout)
-        self.start_button = start_btn
\ No newline at end of file
+        self.start_button = start_btn
+        self.title = title
+
+    def load_custom_font(self):
+        """Регистрирует шрифт заголовка (вызывается, когда окно уже показано)"""
+        font_id = load_font(FONT_PATH)
+        if font_id != -1:
+            font_family = QFontDatabase.applicationFontFamilies(font_id)[0]
+            self.title.setFont(QFont(font_family, 24, QFont.Weight.Bold))
\ No newline at end of file
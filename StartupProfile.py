@@ -0,0 +1,49 @@
+"""Замер запуска: время от старта процесса до первого кадра по фазам
+
+Импортируется первым в Laba3.py, чтобы запомнить момент начала импорта.
+Начало процесса берется из /proc (Linux); где его нет, отсчет идет от
+импорта этого модуля.
+"""
+import os
+import sys
+import time
+
+
+def process_start_time():
+    """Момент старта процесса по часам perf_counter (или None)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Поля после имени процесса; starttime - 22-е поле в тиках с загрузки
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        age = uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+    return time.perf_counter() - max(age, 0.0)
+
+
+IMPORTED_AT = time.perf_counter()
+PROCESS_STARTED = process_start_time()
+
+
+class StartupProfiler:
+    """Последовательные отметки фаз запуска"""
+
+    def __init__(self):
+        self.phases = []
+        if PROCESS_STARTED is not None:
+            self.phases.append(("старт процесса", PROCESS_STARTED))
+        else:
+            self.phases.append(("импорт Laba3", IMPORTED_AT))
+
+    def mark(self, phase):
+        """Фаза phase закончилась сейчас"""
+        self.phases.append((phase, time.perf_counter()))
+
+    def report(self, file=sys.stderr):
+        origin = self.phases[0][1]
+        print(f"{'фаза':<36} {'мс':>8} {'с начала, мс':>14}", file=file)
+        for (_, previous), (phase, moment) in zip(self.phases, self.phases[1:]):
+            print(f"{phase:<36} {(moment - previous) * 1000:>8.1f} {(moment - origin) * 1000:>14.1f}",
+                  file=file)
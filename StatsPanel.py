@@ -0,0 +1,124 @@
+from PyQt6.QtWidgets import QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QGridLayout
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QPainter, QFont
+
+from Theme import theme_engine
+
+
+class MovesHistogram(QWidget):
+    """Столбики гистограммы ходов одного уровня (цвета - из текущей темы)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histogram = None
+        self.setMinimumSize(160, 50)
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self.setToolTip(self.describe())
+        self.update()
+
+    def describe(self):
+        if self.histogram is None:
+            return ""
+        low, width, counts = self.histogram
+        return "\n".join(f"{low + i * width:.0f}-{low + (i + 1) * width:.0f}: {count}"
+                         for i, count in enumerate(counts))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), theme_engine.color('bar_background'))
+        if self.histogram is None:
+            return
+        counts = self.histogram[2]
+        peak = max(counts) or 1
+        bar_width = self.width() / len(counts)
+        bar_color = theme_engine.color('bar')
+        for i, count in enumerate(counts):
+            height = round((self.height() - 2) * count / peak)
+            painter.fillRect(round(i * bar_width) + 1, self.height() - height,
+                             max(round(bar_width) - 2, 1), height, bar_color)
+
+
+class StatsPanel(QWidget):
+    """Панель статистики по уровням: медиана и p90, гистограмма ходов, тренд
+
+    Данные берутся из готовых LevelStats, поэтому обновление панели не
+    зависит от размера истории. Строки уровней levels есть всегда, строки
+    остальных размеров поля появляются, когда по ним есть статистика.
+    """
+
+    rebuild_requested = pyqtSignal()
+
+    def __init__(self, levels, parent=None):
+        super().__init__(parent)
+        self.levels = sorted(levels)
+        self.labels = {}
+        self.histograms = {}
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+
+        layout = QVBoxLayout(self)
+        self.grid = QGridLayout()
+        self.grid.setHorizontalSpacing(15)
+        for level in self.levels:
+            self.add_level(level)
+        self.arrange()
+        layout.addLayout(self.grid)
+
+        rebuild_row = QHBoxLayout()
+        rebuild_row.addStretch()
+        self.rebuild_btn = QPushButton("Пересчитать по истории")
+        self.rebuild_btn.clicked.connect(self.rebuild_requested.emit)
+        rebuild_row.addWidget(self.rebuild_btn)
+        layout.addLayout(rebuild_row)
+
+    def add_level(self, level):
+        label = QLabel()
+        label.setFont(QFont("Arial", 11))
+        self.labels[level] = label
+        self.histograms[level] = MovesHistogram()
+
+    def arrange(self):
+        """Раскладывает строки уровней по возрастанию размера поля"""
+        for row, level in enumerate(sorted(self.labels)):
+            self.grid.addWidget(self.labels[level], row, 0)
+            self.grid.addWidget(self.histograms[level], row, 1)
+
+    def update_stats(self, level_stats):
+        """Обновляет панель из словаря размер поля -> LevelStats"""
+        new_levels = [level for level in level_stats if level not in self.labels]
+        for level in new_levels:
+            self.add_level(level)
+        if new_levels:
+            self.arrange()
+        for level in sorted(self.labels):
+            stats = level_stats.get(level)
+            self.labels[level].setText(self.level_text(level, stats))
+            self.histograms[level].set_histogram(stats.histogram() if stats else None)
+
+    def level_text(self, level, stats):
+        if stats is None or stats.count == 0:
+            return f"{level}x{level}: игр еще не было"
+        summary = stats.summary()
+        lines = [
+            f"{level}x{level}: игр {stats.count}",
+            f"Ходы: медиана {summary['moves_median']:.0f}, p90 {summary['moves_p90']:.0f}",
+            f"Время: медиана {self.format_time(summary['time_median'])}, "
+            f"p90 {self.format_time(summary['time_p90'])}",
+        ]
+        trend = stats.trend()
+        if trend is not None:
+            (moves, _), (previous_moves, _) = trend
+            change = (moves - previous_moves) / previous_moves * 100 if previous_moves else 0.0
+            arrow = "↓" if change < 0 else "↑"
+            lines.append(f"Тренд ходов: {arrow} {abs(change):.0f}% "
+                         f"(последние {stats.TREND_WINDOW}: {moves:.0f})")
+        return "\n".join(lines)
+
+    def format_time(self, seconds):
+        minutes = int(seconds // 60)
+        seconds = seconds % 60
+        return f"{minutes}:{seconds:05.2f}"
@@ -0,0 +1,251 @@
+"""Темы оформления: одна таблица стилей на все приложение
+
+Виджеты не задают себе стили сами, а получают динамическое свойство role
+(например, "tool" или "badge"); вид для каждой роли описан в общем шаблоне
+STYLESHEET. Шаблон подставляется в цвета темы один раз при создании
+Theme, а смена темы - это один setStyleSheet у приложения, без
+пересборки экранов. Поле и гистограммы рисуются QPainter'ом и берут
+готовые QColor из палитры текущей темы.
+"""
+from string import Template
+
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication
+
+STYLESHEET = Template("""
+QLabel[role="start-title"] {
+    color: $accent;
+    margin: 20px;
+    background: $panel_soft;
+    border-radius: 10px;
+    padding: 20px;
+}
+QPushButton[role="start"] {
+    background-color: $button;
+    color: $button_text;
+    border: none;
+    border-radius: 20px;
+    font-size: 24px;
+}
+QPushButton[role="start"]:hover {
+    background-color: $start_hover;
+}
+
+QLabel[role="screen-title"] {
+    color: $text;
+    background: $panel;
+    border-radius: 10px;
+    padding: 15px;
+    margin-bottom: 30px;
+    font-weight: bold;
+}
+QPushButton[role="level"] {
+    background-color: $glass;
+    border: 2px solid $glass_border;
+    border-radius: 15px;
+    padding: 20px;
+    color: $text;
+    font-weight: bold;
+    margin: 5px 50px;
+}
+QPushButton[role="level"]:hover {
+    background-color: $shade;
+    border: 2px solid $glass_border_hover;
+    color: $highlight;
+}
+QPushButton[role="level"]:pressed {
+    background-color: $shade_strong;
+    border: 2px solid $highlight;
+    color: $highlight;
+}
+QPushButton[role="toggle"] {
+    color: $text;
+    background-color: $panel_button;
+    border-radius: 5px;
+    padding: 5px;
+    margin: 0px 50px;
+}
+QPushButton[role="toggle"]:checked {
+    background-color: $shade_strong;
+    color: $highlight;
+}
+QSpinBox[role="size"], QComboBox[role="size"] {
+    color: $text;
+    background-color: $panel_button;
+    border-radius: 5px;
+    padding: 3px 5px;
+}
+
+StatsPanel {
+    background: $panel;
+    border-radius: 10px;
+}
+StatsPanel QLabel {
+    color: $text;
+    background: transparent;
+}
+LeaderboardPanel {
+    background: $panel;
+    border-radius: 10px;
+}
+LeaderboardPanel QLabel {
+    color: $text;
+    background: transparent;
+}
+LeaderboardPanel QTableWidget, LeaderboardPanel QHeaderView,
+LeaderboardPanel QHeaderView::section {
+    color: $text;
+    background: transparent;
+    border: none;
+}
+
+QLabel[role="badge"] {
+    color: $text;
+    background: $panel_soft;
+    padding: 3px;
+    border-radius: 3px;
+}
+QPushButton[role="tool"] {
+    background-color: $glass;
+    border: 1px solid $glass_border;
+    border-radius: 5px;
+    padding: 5px 10px;
+    color: $text;
+}
+QPushButton[role="tool"]:hover {
+    background-color: $shade;
+    border: 1px solid $glass_border_hover;
+    color: $highlight;
+}
+
+QLabel[role="victory-title"] {
+    font-size: 36px;
+    font-weight: bold;
+    color: $highlight;
+    margin: 20px;
+    background: $panel;
+    border-radius: 10px;
+    padding: 10px;
+}
+QLabel[role="stat"] {
+    color: $text;
+    font-size: 18px;
+    margin: 5px;
+    background: $panel_soft;
+    border-radius: 5px;
+    padding: 5px;
+}
+QPushButton[role="action"] {
+    background-color: $button;
+    color: $button_text;
+    border: none;
+    border-radius: 5px;
+    font-size: 14px;
+}
+QPushButton[role="action"]:hover {
+    background-color: $action_hover;
+}
+""")
+
+THEMES = {
+    "Светлая": {
+        'styles': {
+            'text': "black",
+            'accent': "#FF1493",
+            'highlight': "#FFD700",
+            'panel': "rgba(255, 255, 255, 0.8)",
+            'panel_soft': "rgba(255, 255, 255, 0.7)",
+            'panel_button': "rgba(255, 255, 255, 0.6)",
+            'glass': "rgba(255, 255, 255, 0.3)",
+            'glass_border': "rgba(255, 255, 255, 0.5)",
+            'glass_border_hover': "rgba(255, 255, 255, 0.8)",
+            'shade': "rgba(0, 0, 0, 0.3)",
+            'shade_strong': "rgba(0, 0, 0, 0.5)",
+            'button': "rgba(0, 0, 0, 0.9)",
+            'button_text': "white",
+            'start_hover': "rgba(188, 143, 143, 0.9)",
+            'action_hover': "rgba(255, 105, 180, 0.9)",
+        },
+        'colors': {
+            'board': (255, 255, 255, 26),
+            'empty_border': (255, 255, 255, 26),
+            'image': (255, 255, 255, 13),
+            'image_border': (255, 255, 255, 77),
+            'number': (135, 206, 235, 204),
+            'number_border': (70, 130, 180),
+            'number_text': (0, 0, 0),
+            'hover': (255, 215, 0),
+            'bar': (255, 215, 0, 220),
+            'bar_background': (0, 0, 0, 60),
+        },
+    },
+    "Темная": {
+        'styles': {
+            'text': "#E8E8F0",
+            'accent': "#FF69B4",
+            'highlight': "#FFD700",
+            'panel': "rgba(24, 24, 36, 0.85)",
+            'panel_soft': "rgba(24, 24, 36, 0.75)",
+            'panel_button': "rgba(24, 24, 36, 0.65)",
+            'glass': "rgba(24, 24, 36, 0.55)",
+            'glass_border': "rgba(255, 255, 255, 0.25)",
+            'glass_border_hover': "rgba(255, 255, 255, 0.6)",
+            'shade': "rgba(0, 0, 0, 0.6)",
+            'shade_strong': "rgba(0, 0, 0, 0.8)",
+            'button': "rgba(255, 255, 255, 0.9)",
+            'button_text': "black",
+            'start_hover': "rgba(255, 215, 0, 0.9)",
+            'action_hover': "rgba(255, 105, 180, 0.9)",
+        },
+        'colors': {
+            'board': (0, 0, 0, 90),
+            'empty_border': (255, 255, 255, 40),
+            'image': (0, 0, 0, 40),
+            'image_border': (255, 255, 255, 60),
+            'number': (40, 44, 70, 230),
+            'number_border': (120, 130, 200),
+            'number_text': (232, 232, 240),
+            'hover': (255, 215, 0),
+            'bar': (255, 105, 180, 220),
+            'bar_background': (255, 255, 255, 40),
+        },
+    },
+}
+DEFAULT_THEME = "Светлая"
+
+
+class Theme:
+    """Скомпилированная тема: таблица стилей и палитра QColor"""
+
+    def __init__(self, name, description):
+        self.name = name
+        self.stylesheet = STYLESHEET.substitute(description['styles'])
+        self.colors = {key: QColor(*value) for key, value in description['colors'].items()}
+
+
+class ThemeEngine:
+    """Текущая тема приложения"""
+
+    def __init__(self, themes=THEMES, default=DEFAULT_THEME):
+        self.themes = {name: Theme(name, description) for name, description in themes.items()}
+        self.current = self.themes[default]
+
+    def names(self):
+        return list(self.themes)
+
+    def color(self, key):
+        return self.current.colors[key]
+
+    def apply(self, name=None):
+        """Ставит тему приложению: один setStyleSheet, все виджеты перерисуются сами"""
+        if name is not None:
+            self.current = self.themes[name]
+        QApplication.instance().setStyleSheet(self.current.stylesheet)
+
+    def next_theme(self):
+        names = self.names()
+        self.apply(names[(names.index(self.current.name) + 1) % len(names)])
+        return self.current.name
+
+
+theme_engine = ThemeEngine()
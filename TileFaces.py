@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QColor, QFont, QPainter, QPixmap
+
+from Theme import theme_engine
+
+
+class TileFaces:
+    """Процедурные лица фишек для полей, на которые не хватает картинок
+
+    Лицо - плашка цвета темы с номером. Оттенок плашки меняется по строке,
+    а яркость - по столбцу целевой клетки фишки, поэтому на большом поле
+    видно, куда фишка должна попасть. Готовые QPixmap хранятся под ключом
+    (фишка, размер клетки, devicePixelRatio, тема) и вытесняются по LRU,
+    так что на ходу перерисовываются только две клетки из кэша.
+    """
+
+    HUE_SPAN = 150              # разброс оттенка от первой строки к последней
+    VALUE_SPAN = 60             # разброс яркости от первого столбца к последнему
+
+    def __init__(self, size):
+        self.size = size
+        self.max_pixmaps = 2 * size * size
+        self.pixmaps = OrderedDict()
+
+    def color(self, number):
+        """Цвет плашки фишки number по ее целевой клетке"""
+        row, col = divmod(number - 1, self.size)
+        span = max(1, self.size - 1)
+        base = theme_engine.color('number')
+        hue = (max(base.hsvHue(), 0) + self.HUE_SPAN * row // span) % 360
+        value = max(0, base.value() - self.VALUE_SPAN * col // span)
+        return QColor.fromHsv(hue, base.hsvSaturation(), value, base.alpha())
+
+    def pixmap(self, number, tile_size, dpr=1.0):
+        """QPixmap лица фишки для клетки tile_size логических пикселей"""
+        key = (number, tile_size, dpr, theme_engine.current.name)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            return pixmap
+
+        pixels = round(tile_size * dpr)
+        pixmap = QPixmap(pixels, pixels)
+        pixmap.fill(self.color(number))
+        painter = QPainter(pixmap)
+        font = QFont("Arial")
+        font.setBold(True)
+        # Трехзначные номера мельче, чтобы влезали в клетку
+        font.setPixelSize(max(6, round(pixels * (0.45 if number < 100 else 0.34))))
+        painter.setFont(font)
+        painter.setPen(theme_engine.color('number_text'))
+        painter.drawText(QRectF(0, 0, pixels, pixels), Qt.AlignmentFlag.AlignCenter, str(number))
+        painter.end()
+        pixmap.setDevicePixelRatio(dpr)
+
+        self.pixmaps[key] = pixmap
+        while len(self.pixmaps) > self.max_pixmaps:
+            self.pixmaps.popitem(last=False)
+        return pixmap
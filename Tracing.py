@@ -0,0 +1,171 @@
+"""Трассировка задержек интерфейса в формате Chrome trace (Perfetto)
+
+Включается переменной окружения GAME15_TRACE=путь.json или флагом
+--trace [путь.json] у Laba3.py. При выходе пишется сам трейс (открывается
+в chrome://tracing или ui.perfetto.dev) и рядом - путь.summary.json с
+p50/p99 по каждому участку. Два таких файла от разных сборок сравнивает
+    python Tracing.py old.summary.json new.summary.json
+
+Выключенный трейсер стоит одной проверки: span() возвращает общий
+пустой контекстный менеджер.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = "GAME15_TRACE"
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    """Сбор событий трассировки
+
+    Участки кода размечаются span(); клик по полю - input_event(), а
+    frame_painted() в конце отрисовки поля закрывает все ожидавшие клики
+    событием "click -> paint" от момента клика до готового кадра.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.origin_ns = time.perf_counter_ns()
+        self.lock = threading.Lock()
+        self.events = []
+        self.durations = {}         # участок -> длительности в мс
+        self.pending_inputs = []
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def enable(self, path):
+        self.path = path
+
+    def span(self, name, **args):
+        if self.path is None:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def complete(self, name, start_ns, end_ns, args=None, category="span"):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(),
+                 'tid': threading.get_ident(), 'ts': (start_ns - self.origin_ns) / 1000,
+                 'dur': (end_ns - start_ns) / 1000}
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+            self.durations.setdefault(name, []).append((end_ns - start_ns) / 1_000_000)
+
+    def input_event(self, name, start_ns=None):
+        """Пользовательский ввод в момент start_ns (по умолчанию сейчас)
+
+        Задержка считается до следующего кадра, поэтому отмечать стоит только
+        ввод, после которого что-то перерисовывается.
+        """
+        if self.path is not None:
+            self.pending_inputs.append((name, start_ns or time.perf_counter_ns()))
+
+    def frame_painted(self):
+        if not self.pending_inputs:
+            return
+        end_ns = time.perf_counter_ns()
+        for name, start_ns in self.pending_inputs:
+            self.complete(f"{name} -> paint", start_ns, end_ns, category="latency")
+        self.pending_inputs.clear()
+
+    def summary(self):
+        """p50/p99 по каждому участку в миллисекундах"""
+        with self.lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+        result = {}
+        for name, values in sorted(durations.items()):
+            result[name] = {
+                'count': len(values),
+                'p50_ms': round(percentile(values, 0.5), 3),
+                'p99_ms': round(percentile(values, 0.99), 3),
+                'max_ms': round(values[-1], 3),
+            }
+        return result
+
+    def write(self):
+        """Пишет трейс и сводку (вызывается при выходе из приложения)"""
+        if self.path is None:
+            return
+        thread_names = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': thread.ident,
+                         'args': {'name': thread.name}} for thread in threading.enumerate()]
+        with self.lock:
+            events = thread_names + list(self.events)
+        with open(self.path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+        summary = self.summary()
+        with open(summary_path(self.path), 'w') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(format_summary(summary), file=sys.stderr)
+
+
+def percentile(values, q):
+    """Квантиль по отсортированному списку (ближайший ранг)"""
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summary_path(path):
+    root, _ = os.path.splitext(path)
+    return root + ".summary.json"
+
+
+def format_summary(summary, baseline=None):
+    lines = [f"{'участок':<40} {'n':>6} {'p50, мс':>9} {'p99, мс':>9}"]
+    for name, stats in summary.items():
+        line = f"{name:<40} {stats['count']:>6} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f}"
+        if baseline and name in baseline:
+            old = baseline[name]
+            line += f"   было {old['p50_ms']:.3f} / {old['p99_ms']:.3f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+tracer = Tracer()
+if os.environ.get(TRACE_ENV):
+    tracer.enable(os.environ[TRACE_ENV])
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Использование: python Tracing.py old.summary.json new.summary.json", file=sys.stderr)
+        sys.exit(2)
+    with open(sys.argv[1]) as f:
+        baseline = json.load(f)
+    with open(sys.argv[2]) as f:
+        summary = json.load(f)
+    print(format_summary(summary, baseline))
+
+
+if __name__ == "__main__":
+    main()
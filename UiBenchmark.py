@@ -0,0 +1,237 @@
+"""Бенчмарк интерфейса без экрана (QT_QPA_PLATFORM=offscreen)
+
+Примеры:
+    python UiBenchmark.py --save benchmarks/ui_baseline.json
+    python UiBenchmark.py --baseline benchmarks/ui_baseline.json --threshold 0.2
+    python UiBenchmark.py --sizes 3 4 5 8 12 --repeat 50 --output ui_results.json
+
+Для каждого размера поля измеряются: создание GameScreen, update_display
+после хода, перемешивание (shuffle_board) и целая партия по сценарию
+(кликами через tile_clicked). Отдельно - отрисовка фона при нескольких
+размерах окна, с холодным и прогретым кэшем. Для каждого замера
+сохраняется медиана и p90 в миллисекундах.
+
+Результаты партий и таблица расстояний 3x3 живут во временном каталоге,
+отложенный экран победы после партии по сценарию отменяется.
+
+С --baseline результаты сравниваются с сохраненными: замер считается
+регрессией, если его медиана выросла больше чем на threshold (и больше
+чем на NOISE_FLOOR_MS по абсолютной величине). В этом случае код выхода 1.
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import gc
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from PyQt6.QtCore import QT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+import DistanceTable
+from AssetCache import tile_cache
+from Background import BackgroundSource, BackgroundWidget
+from Board import OPPOSITE
+from GameScreen import GameScreen
+from ResultsStore import results_store
+from SessionJournal import session_journal
+from Theme import theme_engine
+
+BACKGROUND_IMAGE = "images/background.png"
+WINDOW_SIZES = [(700, 700), (1280, 800), (1920, 1080), (2560, 1440)]
+NOISE_FLOOR_MS = 0.05
+
+
+def measure(function, repeat, warmup=1):
+    """Медиана и p90 времени вызова function() в миллисекундах"""
+    for _ in range(warmup):
+        function()
+    # Сборщик мусора не должен попадать в случайные замеры
+    gc.collect()
+    gc.disable()
+    samples = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            function()
+            samples.append((time.perf_counter_ns() - started) / 1_000_000)
+    finally:
+        gc.enable()
+    samples.sort()
+    return {
+        'median_ms': round(samples[len(samples) // 2], 4),
+        'p90_ms': round(samples[min(len(samples) - 1, int(0.9 * len(samples)))], 4),
+        'n': repeat,
+    }
+
+
+def scramble(screen, steps, rng):
+    """Случайное блуждание пустой клетки; возвращает направления для обратного пути"""
+    board = screen.board
+    board.reset()
+    path = []
+    while len(path) < steps:
+        direction = rng.randrange(4)
+        if path and direction == OPPOSITE[path[-1]]:
+            continue
+        if board.move_blank(direction):
+            path.append(direction)
+    screen.update_display()
+    return [OPPOSITE[direction] for direction in reversed(path)]
+
+
+def bench_game_screen(app, size, repeat, results):
+    prefix = f"{size}x{size}"
+
+    def construct():
+        screen = GameScreen(size)
+        screen.deleteLater()
+    results[f"{prefix} GameScreen()"] = measure(construct, max(5, repeat // 5))
+    app.processEvents()
+
+    screen = GameScreen(size)
+    screen.set_background(BACKGROUND_IMAGE)
+    screen.resize(800, 800)
+    screen.show()
+    screen.init_game()
+    app.processEvents()
+    rng = random.Random(size)
+
+    def move_and_update():
+        board = screen.board
+        while not board.move_blank(rng.randrange(4)):
+            pass
+        screen.update_display()
+        screen.board_widget.repaint()
+    results[f"{prefix} update_display per move"] = measure(move_and_update, repeat)
+
+    def shuffle():
+        screen.shuffle_board()
+        screen.board_widget.repaint()
+    results[f"{prefix} shuffle_board"] = measure(shuffle, max(5, repeat // 3))
+
+    def scripted_game():
+        solution = scramble(screen, 20 * size, rng)
+        screen.board_widget.set_instant(True)
+        for direction in solution:
+            index = screen.board.neighbor(direction)
+            screen.tile_clicked(*divmod(index, size))
+            app.processEvents()
+        screen.board_widget.set_instant(False)
+        assert screen.board.is_solved()
+        # Экран победы не должен сработать позже и записать партию посреди замеров
+        screen.victory_timer.stop()
+    results[f"{prefix} scripted game ({20 * size} moves)"] = measure(scripted_game, max(5, repeat // 5))
+
+    screen.stop_clock()
+    screen.hide()
+    screen.deleteLater()
+    app.processEvents()
+
+
+def bench_background(app, repeat, results):
+    widget = BackgroundWidget()
+    widget.set_background(BACKGROUND_IMAGE)
+    widget.show()
+    source = widget.background
+    for width, height in WINDOW_SIZES:
+        widget.resize(width, height)
+        widget.finish_resize()
+        app.processEvents()
+
+        def cold():
+            source.cache.clear()
+            widget.repaint()
+        results[f"background {width}x{height} cold"] = measure(cold, max(5, repeat // 5))
+        results[f"background {width}x{height} cached"] = measure(widget.repaint, repeat)
+    widget.deleteLater()
+    app.processEvents()
+
+
+def compare(results, baseline, threshold):
+    """Печатает сравнение с базовой линией; возвращает список регрессий"""
+    regressions = []
+    print(f"{'замер':<44} {'было, мс':>10} {'стало, мс':>10} {'изм.':>8}")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<44} {'-':>10} {result['median_ms']:>10.3f}")
+            continue
+        before, after = old['median_ms'], result['median_ms']
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > NOISE_FLOOR_MS
+        mark = "  РЕГРЕССИЯ" if regressed else ""
+        print(f"{name:<44} {before:>10.3f} {after:>10.3f} {change * 100:>7.1f}%{mark}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк интерфейса без экрана")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4, 5, 8])
+    parser.add_argument("--repeat", type=int, default=30, help="повторов на замер")
+    parser.add_argument("--output", help="записать результаты в JSON")
+    parser.add_argument("--save", metavar="PATH", help="сохранить результаты как базовую линию")
+    parser.add_argument("--baseline", metavar="PATH", help="сравнить с базовой линией")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="допустимый рост медианы (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # Партии бенчмарка не должны попадать в настоящую историю и журнал
+    scratch = tempfile.mkdtemp(prefix="ui_bench_")
+    results_store.path = os.path.join(scratch, "results.db")
+    results_store.legacy_json = os.path.join(scratch, "best_results.json")
+    session_journal.path = os.path.join(scratch, "session.journal")
+    # Таблица расстояний 3x3 строится заранее и только во временном каталоге:
+    # замеры 3x3 не зависят от того, есть ли pdb/ в рабочем каталоге
+    DistanceTable.TABLE_PATH = os.path.join(scratch, "3x3_distances.bin")
+    DistanceTable.write_table(DistanceTable.build_table(), DistanceTable.TABLE_PATH)
+
+    app = QApplication(sys.argv[:1])
+    theme_engine.apply()
+    # Картинки фишек декодируются заранее: замеряется интерфейс, а не PNG
+    for number in range(1, tile_cache.count + 1):
+        tile_cache.image(number)
+    BackgroundSource.shared(BACKGROUND_IMAGE)
+
+    results = {}
+    for size in args.sizes:
+        bench_game_screen(app, size, args.repeat, results)
+        print(f"{size}x{size} готово", file=sys.stderr)
+    bench_background(app, args.repeat, results)
+    session_journal.close()
+    results_store.close()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'qt': QT_VERSION_STR,
+                 'platform': platform.platform(), 'repeat': args.repeat},
+        'results': results,
+    }
+    for path in [args.output, args.save]:
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Регрессий: {len(regressions)} (порог {args.threshold * 100:.0f}%)", file=sys.stderr)
+            sys.exit(1)
+    else:
+        for name, result in results.items():
+            print(f"{name:<44} {result['median_ms']:>10.3f} мс  (p90 {result['p90_ms']:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,17 +20,7 @@ class VictoryScreen(BackgroundWidget):
         # Заголовок
         title = QLabel("ПОБЕДА!")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            QLabel {
-                font-size: 36px;
-                font-weight: bold;
-                color: #FFD700;
-                margin: 20px;
-                background: rgba(255, 255, 255, 0.8);
-                border-radius: 10px;
-                padding: 10px;
-            }
-        """)
+        title.setProperty("role", "victory-title")
 
         # Статистика
         time_label = QLabel(f"Время: {self.format_time(self.time_elapsed)}")
@@ -39,29 +29,16 @@ class VictoryScreen(BackgroundWidget):
 
         for label in [time_label, moves_label, level_label]:
             label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            label.setStyleSheet("""
-                font-size: 18px;
-                margin: 5px;
-                background: rgba(255, 255, 255, 0.7);
-                border-radius: 5px;
-                padding: 5px;
-            """)
+            label.setProperty("role", "stat")
 
         # Кнопка
         menu_btn = QPushButton("В меню")
         menu_btn.setMinimumSize(120, 40)
-        menu_btn.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(0, 0, 0, 0.9);
-                color: white;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 105, 180, 0.9);
-            }
-        """)
+        menu_btn.setProperty("role", "action")
+
+        replay_btn = QPushButton("Повтор партии")
+        replay_btn.setMinimumSize(120, 40)
+        replay_btn.setProperty("role", "action")
 
         # Компоновка
         layout.addWidget(title)
@@ -69,9 +46,11 @@ class VictoryScreen(BackgroundWidget):
         layout.addWidget(moves_label)
         layout.addWidget(level_label)
         layout.addWidget(menu_btn)
+        layout.addWidget(replay_btn)
 
         self.setLayout(layout)
         self.menu_btn = menu_btn
+        self.replay_btn = replay_btn
 
     def format_time(self, seconds):
         minutes = int(seconds // 60)